@@ -0,0 +1,57 @@
+"""Compare the memory held by parsed records.
+
+    $ python benchmarks/bench_memory.py
+"""
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from challonge import api  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def retained(func, payload):
+    """Return the bytes still allocated by the result of func(payload)."""
+    payload = copy.deepcopy(payload)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(payload)
+    del payload
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    tz = api.get_timezone()
+
+    def read_all(records):
+        for r in records:
+            for k in r:
+                r[k]
+        return records
+
+    for label, payload in [
+            ("matches.index, 512 players", fixtures.matches(512)),
+            ("participants.index, 512 players", fixtures.participants(512))]:
+        results = [
+            ("dict", retained(lambda p: api._parse(p, tz), payload)),
+            ("lazy", retained(lambda p: api._parse(p, tz, lazy=True), payload)),
+            ("lazy, read", retained(lambda p: read_all(api._parse(p, tz, lazy=True)), payload)),
+        ]
+        print("%s (%d records)" % (label, len(payload)))
+        for name, size in results:
+            print("  %-12s %8.1f KiB  %5d bytes/record" % (
+                name, size / 1024.0, size // len(payload)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare the response parser with the previous try/except cascade.
+
+    $ python benchmarks/bench_parse.py
+"""
+import copy
+import json
+import os
+import sys
+import timeit
+
+import iso8601
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from challonge import api  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def legacy_parse(data, tz):
+    """The parser of pychal 1.10.0."""
+    if not data:
+        return []
+    elif isinstance(data, (tuple, list)):
+        return [legacy_parse(subdata, tz) for subdata in data]
+
+    d = {ik: v for k in data.keys() for ik, v in data[k].items()}
+
+    to_parse = dict(d)
+    for k, v in to_parse.items():
+        if k in {
+                "name",
+                "display_name",
+                "display_name_with_invitation_email_address",
+                "username",
+                "challonge_username"}:
+            continue
+        if isinstance(v, str):
+            try:
+                dt = iso8601.parse_date(v)
+                d[k] = dt.astimezone(tz)
+            except iso8601.ParseError:
+                try:
+                    d[k] = float(v)
+                except ValueError:
+                    pass
+
+    return d
+
+
+def main():
+    tz = api.get_timezone()
+    payloads = [
+        ("matches.index, 512 players", fixtures.matches(512)),
+        ("participants.index, 512 players", fixtures.participants(512)),
+    ]
+    for label, payload in payloads:
+        assert legacy_parse(payload, tz) == api._parse(payload, tz)
+        old = min(timeit.repeat(lambda: legacy_parse(payload, tz), number=5, repeat=5)) / 5
+        new = min(timeit.repeat(lambda: api._parse(payload, tz), number=5, repeat=5)) / 5
+        print("%-34s legacy %7.2f ms   current %7.2f ms   %5.1fx" % (
+            label, old * 1000, new * 1000, old / new))
+
+    # lazy records, reading only the fields most consumers use; the lazy
+    # parser memoizes into the decoded payload so each run gets a copy
+    payload = fixtures.matches(512)
+    fields = ("id", "state", "player1_id", "player2_id", "winner_id")
+
+    def best(func, runs=25):
+        copies = [copy.deepcopy(payload) for _ in range(runs)]
+        return min(timeit.repeat(lambda: func(copies.pop()), number=1, repeat=runs))
+
+    def eager(data):
+        api._parse(data, tz)
+
+    def lazy(data):
+        for m in api._parse(data, tz, lazy=True):
+            for f in fields:
+                m[f]
+
+    old, new = best(eager), best(lazy)
+    print("%-34s eager  %7.2f ms   lazy    %7.2f ms   %5.1fx" % (
+        "matches.index, 5 fields read", old * 1000, new * 1000, old / new))
+
+    # decoding the body of a response, the previous code decoded the
+    # bytes to text first
+    body = json.dumps(payload).encode("utf-8")
+    old = min(timeit.repeat(lambda: json.loads(body.decode("utf-8")), number=5, repeat=5)) / 5
+    for backend in api.JSON_BACKENDS:
+        try:
+            loads = api.get_json_loads(backend)
+        except ImportError:
+            continue
+        new = min(timeit.repeat(lambda: loads(body), number=5, repeat=5)) / 5
+        print("%-34s text   %7.2f ms   %-7s %7.2f ms   %5.1fx" % (
+            "decode matches.index, 512 players", old * 1000, backend, new * 1000, old / new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare two result files of benchmarks/suite.py.
+
+    $ python benchmarks/compare.py before.json after.json --threshold 0.1
+
+The best runs are compared, the fastest time or the highest rate, as
+they are the least disturbed by other processes. Exits with status 1
+when a benchmark got slower than the threshold, a fraction of the old
+value.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        document = json.load(f)
+    if document.get("format") != 1:
+        raise ValueError("%s isn't a result file of benchmarks/suite.py" % path)
+    return document
+
+
+def change(old, new):
+    """Return how much slower new is than old, negative when faster."""
+    if old["unit"] == "s":
+        return new["min"] / old["min"] - 1
+    # rates, the higher the better
+    return old["max"] / new["max"] - 1
+
+
+def compare(before, after, threshold=0.1):
+    """Print the changes between two result documents and return the
+    names of the benchmarks slower by more than threshold."""
+    old_results = {r["name"]: r for r in before["results"]}
+    regressions = []
+    for new in after["results"]:
+        old = old_results.pop(new["name"], None)
+        if old is None:
+            print("%-48s %12s" % (new["name"], "new"))
+            continue
+        slower = change(old, new)
+        if slower > threshold:
+            status = "slower"
+            regressions.append(new["name"])
+        elif slower < -threshold:
+            status = "faster"
+        else:
+            status = ""
+        print("%-48s %+11.1f%%  %s" % (new["name"], slower * 100, status))
+    for name in old_results:
+        print("%-48s %12s" % (name, "removed"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fraction of slow down reported as a regression")
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    for key in ("python", "json_backend"):
+        if before.get(key) != after.get(key):
+            print("warning: %s changed from %s to %s" % (key, before.get(key), after.get(key)))
+    regressions = compare(before, after, args.threshold)
+    if regressions:
+        print("%d regression(s) above %d%%" % (len(regressions), args.threshold * 100))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
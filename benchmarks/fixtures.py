@@ -0,0 +1,98 @@
+"""Synthetic challonge.com payloads shaped like real API responses."""
+import datetime
+import random
+
+
+def _timestamp(base, minutes):
+    dt = base + datetime.timedelta(minutes=minutes)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + "%03d-05:00" % (minutes % 1000)
+
+
+def match(tournament_id, match_id, round_, player1_id, player2_id, base):
+    return {"match": {
+        "attachment_count": None,
+        "created_at": _timestamp(base, 0),
+        "group_id": None,
+        "has_attachment": False,
+        "id": match_id,
+        "identifier": "A%d" % match_id,
+        "location": None,
+        "loser_id": player2_id,
+        "player1_id": player1_id,
+        "player1_is_prereq_match_loser": False,
+        "player1_prereq_match_id": None,
+        "player1_votes": None,
+        "player2_id": player2_id,
+        "player2_is_prereq_match_loser": False,
+        "player2_prereq_match_id": None,
+        "player2_votes": None,
+        "round": round_,
+        "scheduled_time": None,
+        "started_at": _timestamp(base, match_id % 90),
+        "state": "complete",
+        "tournament_id": tournament_id,
+        "underway_at": _timestamp(base, match_id % 90 + 1),
+        "updated_at": _timestamp(base, match_id % 90 + 5),
+        "winner_id": player1_id,
+        "prerequisite_match_ids_csv": "",
+        "scores_csv": "2-%d" % (match_id % 2),
+        "completed_at": _timestamp(base, match_id % 90 + 5),
+        "suggested_play_order": match_id,
+        "optional": False,
+        "forfeited": None,
+    }}
+
+
+def participant(tournament_id, participant_id, seed, base):
+    name = "player %d" % participant_id
+    return {"participant": {
+        "active": True,
+        "checked_in_at": None,
+        "created_at": _timestamp(base, seed),
+        "final_rank": None,
+        "group_id": None,
+        "icon": None,
+        "id": participant_id,
+        "invitation_id": None,
+        "invite_email": None,
+        "misc": None,
+        "name": name,
+        "on_waiting_list": False,
+        "seed": seed,
+        "tournament_id": tournament_id,
+        "updated_at": _timestamp(base, seed),
+        "challonge_username": None,
+        "challonge_email_address_verified": None,
+        "removable": False,
+        "participatable_or_invitation_attached": False,
+        "confirm_remove": True,
+        "invitation_pending": False,
+        "display_name_with_invitation_email_address": name,
+        "email_hash": None,
+        "username": None,
+        "attached_participatable_portrait_url": None,
+        "can_check_in": False,
+        "checked_in": False,
+        "reactivatable": False,
+        "display_name": name,
+        "group_player_ids": [],
+    }}
+
+
+def matches(players, tournament_id=1, seed=0):
+    """Return a matches.index payload of a double elimination bracket."""
+    rnd = random.Random(seed)
+    base = datetime.datetime(2020, 8, 10, 12, 0)
+    ids = list(range(1000, 1000 + players))
+    count = 2 * players - 2
+    return [
+        match(tournament_id, 5000 + i, i % 10 + 1, rnd.choice(ids), rnd.choice(ids), base)
+        for i in range(count)]
+
+
+def participants(players, tournament_id=1):
+    """Return a participants.index payload."""
+    base = datetime.datetime(2020, 8, 10, 12, 0)
+    return [
+        participant(tournament_id, 1000 + i, i + 1, base)
+        for i in range(players)]
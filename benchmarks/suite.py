@@ -0,0 +1,263 @@
+"""Time the parse, parameter and request hot paths and save the results.
+
+Everything runs offline: parsing uses the payloads of fixtures.py and
+requests are sent to a challonge.emulator.Emulator on localhost.
+
+    $ python benchmarks/suite.py --output before.json
+    $ git checkout my-branch
+    $ python benchmarks/suite.py --output after.json
+    $ python benchmarks/compare.py before.json after.json
+
+Use --filter to run some of the benchmarks, e.g. --filter parse.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import challonge  # noqa: E402
+from challonge import api  # noqa: E402
+from challonge.emulator import Emulator  # noqa: E402
+import fixtures  # noqa: E402
+
+
+# file format of the results, bumped when compare.py can't read older ones
+FORMAT = 1
+
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    """Raised by the setup of a benchmark which can't run here."""
+
+
+def benchmark(name, unit="s", repeat=7):
+    """Register a function returning a callable to time as a benchmark.
+
+    Benchmarks measuring throughput return the callable's result instead:
+    a number of operations per second, the higher the better.
+    """
+    def register(func):
+        BENCHMARKS.append((name, unit, repeat, func))
+        return func
+    return register
+
+
+def measure(func, repeat, number=None):
+    """Return the time of one call of func for each of repeat runs.
+
+    Like timeit, the garbage collector is disabled while timing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(func, repeat, number)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _measure(func, repeat, number):
+    if number is None:
+        # run enough calls for runs of about 50 ms
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - started > 0.05:
+                break
+            number *= 2
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - started) / number)
+    return times
+
+
+# parsing
+
+def _parse_benchmark(name, payload, lazy=False):
+    @benchmark(name)
+    def setup(context):
+        tz = api.get_timezone()
+        return lambda: api._parse(payload, tz, lazy)
+
+
+_parse_benchmark("parse matches.index, 16 players", fixtures.matches(16))
+_parse_benchmark("parse matches.index, 512 players", fixtures.matches(512))
+_parse_benchmark("parse participants.index, 16 players", fixtures.participants(16))
+_parse_benchmark("parse participants.index, 512 players", fixtures.participants(512))
+
+
+@benchmark("decode matches.index, 512 players")
+def decode(context):
+    body = json.dumps(fixtures.matches(512)).encode("utf-8")
+    loads = api.get_json_loads()
+    return lambda: loads(body)
+
+
+# parameters
+
+@benchmark("params participants.bulk_add, 512 names")
+def bulk_add_params(context):
+    names = ["player %d" % i for i in range(512)]
+    misc = [str(i) for i in range(512)]
+    return lambda: api._prepare_params({"name": names, "misc": misc}, "participants[]")
+
+
+@benchmark("params tournaments.create")
+def create_params(context):
+    start_at = datetime.datetime(2020, 8, 10, 12, 0)
+    return lambda: api._prepare_params({
+        "name": "cup", "url": "cup", "tournament_type": "single elimination",
+        "open_signup": False, "start_at": start_at, "check_in_duration": 30}, "tournament")
+
+
+# requests to the emulator
+
+@benchmark("request tournaments.show")
+def show_latency(context):
+    client, t = context["client"], context["tournament"]
+    return lambda: client.tournaments.show(t["id"])
+
+
+@benchmark("request matches.index, 64 players")
+def index_latency(context):
+    client, t = context["client"], context["tournament"]
+    return lambda: client.matches.index(t["id"])
+
+
+@benchmark("throughput tournaments.show, 8 threads", unit="req/s", repeat=5)
+def threaded_throughput(context):
+    client, t = context["client"], context["tournament"]
+    calls = [((t["id"],), {})] * 200
+
+    def run():
+        started = time.perf_counter()
+        for result in client.run_batch(client.tournaments.show, calls, max_workers=8):
+            if result.error is not None:
+                raise result.error
+        return len(calls) / (time.perf_counter() - started)
+    return run
+
+
+@benchmark("throughput tournaments.show, asyncio x32", unit="req/s", repeat=5)
+def async_throughput(context):
+    try:
+        from challonge.aio.client import AsyncChallonge
+    except ImportError:
+        raise Skip("aiohttp isn't installed")
+    t = context["tournament"]
+
+    async def gather(client, count):
+        await asyncio.gather(*[client.tournaments.show(t["id"]) for _ in range(count)])
+
+    async def main():
+        client = AsyncChallonge(
+            "bench", "bench", api_url=context["emulator"].url, max_concurrency=32)
+        try:
+            # open the connections before timing
+            await gather(client, 32)
+            started = time.perf_counter()
+            await gather(client, 200)
+            return 200 / (time.perf_counter() - started)
+        finally:
+            await client.close()
+
+    return lambda: asyncio.run(main())
+
+
+def _context():
+    emulator = Emulator()
+    emulator.start()
+    client = challonge.Challonge("bench", "bench", api_url=emulator.url)
+    t = client.tournaments.create("bench", "bench")
+    client.participants.bulk_add(t["id"], ["player %d" % i for i in range(64)])
+    client.tournaments.start(t["id"])
+    return {"emulator": emulator, "client": client, "tournament": t}
+
+
+def run(names=None):
+    """Run the benchmarks whose name contains one of names and return
+    the results document."""
+    selected = [b for b in BENCHMARKS if not names or any(n in b[0] for n in names)]
+    context = _context()
+    results = []
+    try:
+        for name, unit, repeat, setup in selected:
+            try:
+                func = setup(context)
+            except Skip as e:
+                print("%-48s skipped: %s" % (name, e))
+                continue
+            if unit == "s":
+                values = measure(func, repeat)
+            else:
+                func()
+                values = [func() for _ in range(repeat)]
+            results.append({
+                "name": name,
+                "unit": unit,
+                "min": min(values),
+                "median": statistics.median(values),
+                "max": max(values),
+                "runs": len(values),
+            })
+            print(_format(results[-1]))
+    finally:
+        context["client"].close()
+        context["emulator"].stop()
+    return {
+        "format": FORMAT,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": _json_backend(),
+        "results": results,
+    }
+
+
+def _json_backend():
+    for backend in api.JSON_BACKENDS:
+        try:
+            api.get_json_loads(backend)
+        except ImportError:
+            continue
+        return backend
+
+
+def _format(result):
+    if result["unit"] == "s":
+        return "%-48s %10.3f ms  (median %.3f ms)" % (
+            result["name"], result["min"] * 1000, result["median"] * 1000)
+    return "%-48s %10.0f %s (median %.0f)" % (
+        result["name"], result["max"], result["unit"], result["median"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", "-o", help="write the results to this JSON file")
+    parser.add_argument("--filter", "-k", action="append",
+                        help="only run the benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    document = run(args.filter)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,17 @@
 from challonge import (
+    bracket,
+    cache,
+    cassette,
+    circuit,
+    conditional,
+    hooks,
+    ratelimit,
+    records,
+    scheduler,
+    singleflight,
+    streaming,
+    sync,
+    tracing,
     tournaments,
     matches,
     participants,
@@ -9,4 +22,13 @@ from challonge.api import (
     set_timezone,
     get_timezone,
     fetch,
+    configure_session,
+    close_session,
+    set_rate_limit,
+    set_retry_policy,
+    set_circuit_breaker,
+    add_hook,
+    remove_hook,
     ChallongeException)
+from challonge.circuit import CircuitOpenError
+from challonge.client import Challonge
@@ -0,0 +1,11 @@
+from challonge.aio import (
+    tournaments,
+    matches,
+    participants,
+    attachments)
+from challonge.aio.api import (
+    fetch,
+    fetch_and_parse,
+    close_session,
+    ChallongeException)
+from challonge.aio.client import AsyncChallonge
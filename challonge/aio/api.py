@@ -0,0 +1,73 @@
+import threading
+
+from challonge import api
+from challonge.api import ChallongeException
+
+
+ASYNC_SESSION_DEFAULTS = {
+    "limit": 100,
+    "limit_per_host": 0,
+    "max_concurrency": 100,
+    "timeout": api.DEFAULT_TIMEOUT,
+}
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the client used by the module level coroutines.
+
+    It shares its credentials and timezone with challonge.set_credentials()
+    and challonge.set_timezone().
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                from challonge.aio.client import _DefaultAsyncChallonge
+                _default_client = _DefaultAsyncChallonge()
+    return _default_client
+
+
+async def fetch(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and return the response with its body read."""
+    return await get_default_client().fetch(method, uri, params_prefix, **params)
+
+
+async def fetch_and_parse(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and return python dictionary with parsed data-types."""
+    return await get_default_client().fetch_and_parse(method, uri, params_prefix, **params)
+
+
+async def fetch_and_iterate(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and yield the parsed records of the list it
+    returns, each one as soon as it is read."""
+    async for record in get_default_client().fetch_and_iterate(
+            method, uri, params_prefix, **params):
+        yield record
+
+
+async def close_session():
+    """Close the connection pool of the default asynchronous client."""
+    await get_default_client().close()
+
+
+async def run_batch(func, calls, max_concurrency=None):
+    """Await func once per (args, kwargs) pair of calls concurrently.
+
+    Return one challonge.batch.BatchResult per call, in order.
+    """
+    return await get_default_client().run_batch(func, calls, max_concurrency)
+
+
+def _check_session_options(options):
+    unknown = set(options) - set(ASYNC_SESSION_DEFAULTS)
+    if unknown:
+        raise TypeError("Unknown session options: %s" % ", ".join(sorted(unknown)))
+
+
+def _form_values(params):
+    # aiohttp only accepts strings, and like requests we leave out
+    # parameters without a value
+    return [(k, "%s" % v) for k, v in params if v is not None]
@@ -0,0 +1,461 @@
+import asyncio
+import threading
+import time
+
+import aiohttp
+
+from challonge import api as sync_api, circuit, hooks, ratelimit, streaming, tracing
+from challonge.batch import BatchResult, ITEM_ERRORS
+from challonge.cache import MISSING, Generations, request_key
+from challonge.client import _Resource, _validator_cache
+from challonge.singleflight import AsyncSingleFlight
+from challonge.aio import (
+    api,
+    tournaments,
+    matches,
+    participants,
+    attachments)
+
+
+class AsyncChallonge(object):
+    """An asyncio challonge.com API client.
+
+    It mirrors ``challonge.Challonge``, but every resource function is a
+    coroutine::
+
+        async with challonge.aio.AsyncChallonge("my_user", "my_api_key") as client:
+            ms = await client.matches.index(3272)
+
+    All requests share one aiohttp connection pool and at most
+    ``max_concurrency`` requests are in flight at the same time, further
+    requests wait for a free slot.
+
+    :keyword param username: challonge.com username
+    :keyword param api_key: challonge.com api key
+    :keyword param timezone: timezone string or tzinfo for datetime
+        fields, defaults to your machine's timezone
+    :keyword param lazy: return challonge.records.Record objects which
+        convert datetime and float fields on first access
+    :keyword param json_backend: 'orjson', 'ujson' or 'json', by default
+        the fastest one installed
+    :keyword param api_url: host and path of the API, defaults to
+        ``challonge.api.CHALLONGE_API_URL``; https is used unless it
+        starts with another scheme
+    :keyword param cache: a challonge.cache.ResponseCache for GET requests,
+        writes made through the client invalidate the related entries
+    :keyword param store: a challonge.store.TournamentStore, GET requests
+        of complete tournaments are answered from it
+    :keyword param conditional: send conditional GET requests and return
+        the previous result when nothing changed, True or a
+        challonge.conditional.ValidatorCache
+    :keyword param coalesce: let concurrent identical GET requests share a
+        single HTTP request and parsed result
+    :keyword param rate_limit: requests per second per username, or a
+        challonge.ratelimit.RateLimiter shared with other clients
+    :keyword param retry: retry throttled and failed requests, True, a
+        number of retries or a challonge.ratelimit.RetryPolicy
+    :keyword param circuit_breaker: fail fast with
+        challonge.circuit.CircuitOpenError while the API keeps failing,
+        True or a challonge.circuit.CircuitBreaker
+    :keyword param limit: maximum number of open connections
+    :keyword param limit_per_host: maximum number of open connections
+        to the same host, 0 means no limit
+    :keyword param max_concurrency: maximum number of requests in flight
+    :keyword param timeout: seconds to wait for the server, either a
+        single number or a (connect, read) tuple
+    """
+
+    def __init__(self, username=None, api_key=None, timezone=None,
+                 lazy=False, json_backend=None, api_url=None, cache=None,
+                 store=None, conditional=False, coalesce=False, rate_limit=None,
+                 retry=None, circuit_breaker=None, **session_options):
+        api._check_session_options(session_options)
+
+        self._lock = threading.RLock()
+        self._credentials = {"user": username, "api_key": api_key}
+        self._tz = sync_api._get_timezone(timezone)
+        self._session_options = dict(api.ASYNC_SESSION_DEFAULTS, **session_options)
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+        self.api_url = api_url
+        self.lazy = lazy
+        self.cache = cache
+        self.store = store
+        self.validators = _validator_cache(conditional)
+        self.coalesce = coalesce
+        self._flights = AsyncSingleFlight()
+        self._generations = Generations()
+        self.set_json_backend(json_backend)
+        self.set_rate_limit(rate_limit)
+        self.set_retry_policy(retry)
+        self.set_circuit_breaker(circuit_breaker)
+        self.hooks = hooks.Hooks()
+
+        self.tournaments = _Resource(self, tournaments)
+        self.matches = _Resource(self, matches)
+        self.participants = _Resource(self, participants)
+        self.attachments = _Resource(self, attachments)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def set_credentials(self, username, api_key):
+        """Set the challonge.com api credentials to use."""
+        with self._lock:
+            self._credentials["user"] = username
+            self._credentials["api_key"] = api_key
+
+    def get_credentials(self):
+        """Retrieve the challonge.com credentials in use."""
+        with self._lock:
+            return self._credentials["user"], self._credentials["api_key"]
+
+    def set_timezone(self, new_tz=None):
+        """Set the timezone for datetime fields.
+
+        If it's called without parameter sets the local time again.
+        """
+        self._tz = sync_api._get_timezone(new_tz or None)
+
+    def get_timezone(self):
+        """Return currently timezone in use."""
+        return self._tz
+
+    def set_json_backend(self, backend=None):
+        """Set the JSON decoder, see ``challonge.api.set_json_backend()``."""
+        self._json_loads = sync_api.get_json_loads(backend)
+
+    def set_rate_limit(self, rate_limit=None):
+        """Limit the requests per second of each username, None to remove
+        the limit."""
+        self.rate_limiter = ratelimit.rate_limiter(rate_limit)
+
+    def set_retry_policy(self, retry=None):
+        """Set when failed requests are sent again, None to never retry."""
+        self.retry = ratelimit.retry_policy(retry)
+
+    def set_circuit_breaker(self, breaker=None):
+        """Set the circuit breaker, True for a default one, None to always
+        send requests."""
+        self.circuit_breaker = circuit.circuit_breaker(breaker)
+
+    def add_hook(self, event, func):
+        """Call func(info) on an event of each request, see
+        challonge.hooks."""
+        self.hooks.add(event, func)
+
+    def remove_hook(self, event, func):
+        """Stop calling func on event."""
+        self.hooks.remove(event, func)
+
+    def get_session(self):
+        """Return the aiohttp session of the running event loop.
+
+        The session and the concurrency limit are bound to the loop
+        they were created in, so a new pool is created when the client
+        is used from another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            options = self._session_options
+            timeout = options["timeout"]
+            if isinstance(timeout, (tuple, list)):
+                timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total=timeout)
+            connector = aiohttp.TCPConnector(
+                limit=options["limit"],
+                limit_per_host=options["limit_per_host"])
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(options["max_concurrency"])
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """Close all pooled connections.
+
+        The client stays usable, a new session is created on the next
+        request.
+        """
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def fetch(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return the response with its body read."""
+        response, body = await self._request(method, uri, params_prefix, params)
+        return response
+
+    async def fetch_and_parse(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return python dictionary with parsed data-types."""
+        info = self.hooks.start(method, uri)
+        if method != "GET" or not self._get_layers():
+            response, body = await self._request(method, uri, params_prefix, params, info=info)
+            return self._timed_parse(body, info)
+
+        key = request_key(uri, params, params_prefix)
+        generation = None
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not MISSING:
+                return result
+            generation = self.cache.generations.current(uri)
+        if self.coalesce:
+            # requests started before a write to the tournament aren't
+            # joined, their result may not include it
+            flight = key, self._generations.current(uri)
+            return await self._flights.do(
+                flight, self._get, key, uri, params_prefix, params, info, generation)
+        return await self._get(key, uri, params_prefix, params, info, generation)
+
+    async def fetch_and_iterate(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and yield the parsed records of the list it
+        returns, each one as soon as it is read.
+
+        The body is read in chunks, so the memory used doesn't depend on
+        the length of the list. The response isn't cached or stored.
+        """
+        response, body = await self._request(method, uri, params_prefix, params, stream=True)
+        try:
+            splitter = streaming.ArraySplitter()
+            async for chunk in response.content.iter_chunked(streaming.CHUNK_SIZE):
+                for element in splitter.feed(chunk):
+                    yield self._parse(element)
+            splitter.close()
+        finally:
+            response.release()
+
+    async def _get(self, key, uri, params_prefix, params, info=None, generation=None):
+        # the store is a local SQLite file, fast enough to use in the loop
+        store = self.store
+        body = store.get(key) if store is not None else None
+        from_store = body is not None
+        if from_store:
+            result = self._parse(body)
+        elif self.validators is None:
+            response, body = await self._request("GET", uri, params_prefix, params, info=info)
+            result = self._timed_parse(body, info)
+        else:
+            previous = self.validators.get(key)
+            response, body = await self._request(
+                "GET", uri, params_prefix, params,
+                previous.headers() if previous is not None else None, info=info)
+            result = self.validators.update(
+                key, previous, response.status, response.headers, body,
+                lambda body: self._timed_parse(body, info))
+            if response.status == 304:
+                body = None
+
+        if store is not None and body is not None and not from_store:
+            store.observe(key, body, result)
+
+        if self.cache is not None:
+            self.cache.set(key, result, generation)
+        return result
+
+    def _get_layers(self):
+        # whether GET requests go through any of the optional layers
+        return (self.cache is not None or self.store is not None or
+                self.validators is not None or self.coalesce)
+
+    async def _request(self, method, uri, params_prefix, params, headers=None, stream=False,
+                       info=None):
+        # aiohttp releases the connection once the body is read, after
+        # that the body is only available to text() and json(); with
+        # stream the body of a successful response is left to the caller
+        # which must release the response
+        params = api._form_values(sync_api._prepare_params(params, params_prefix))
+        if info is None:
+            info = self.hooks.start(method, uri)
+
+        if method == "POST" or method == "PUT":
+            r_data = {"data": params}
+        else:
+            r_data = {"params": params}
+
+        # build the HTTP request and use basic authentication
+        url = sync_api._build_url(self.api_url or sync_api.CHALLONGE_API_URL, uri)
+        user, api_key = self.get_credentials()
+        auth = aiohttp.BasicAuth(user or "", api_key or "")
+
+        span = tracing.request_span(method, uri)
+        try:
+            with span:
+                response, body = await self._send(method, url, auth, headers, r_data, stream, info)
+                span.set_attribute("http.status_code", response.status)
+                if response.status != 422:
+                    response.raise_for_status()
+                else:
+                    # wrap up application-level errors
+                    doc = await response.json(content_type=None)
+                    if doc.get("errors"):
+                        raise api.ChallongeException(*doc['errors'])
+        except Exception as e:
+            self.hooks.emit(hooks.ERROR, info, error=e)
+            raise
+        finally:
+            if method != "GET":
+                self._generations.bump(uri)
+                if self.cache is not None:
+                    self.cache.invalidate(uri)
+                if self.store is not None:
+                    self.store.invalidate(uri)
+
+        return response, body
+
+    async def _send(self, method, url, auth, headers, r_data, stream=False, info=None):
+        # send a request within the rate limit, retrying it as the retry
+        # policy allows, and return the last response and its body
+        limiter, retry, breaker = self.rate_limiter, self.retry, self.circuit_breaker
+        bucket = limiter.bucket(auth.login or None) if limiter is not None else None
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before()
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            session = self.get_session()
+            try:
+                async with self._semaphore:
+                    self.hooks.emit(hooks.PRE_REQUEST, info, attempt=attempt)
+                    started = time.monotonic()
+                    response = await session.request(
+                        method, url, auth=auth, headers=headers, **r_data)
+                    if stream and response.status < 400:
+                        body = None
+                    else:
+                        try:
+                            body = await response.read()
+                        finally:
+                            response.release()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if breaker is not None:
+                    breaker.record(False)
+                if retry is None:
+                    raise
+                # only a failed connection tells the request wasn't sent
+                delay = retry.delay(
+                    method, attempt, sent=not isinstance(e, aiohttp.ClientConnectorError))
+                if delay is None:
+                    raise
+                self.hooks.emit(hooks.RETRY, info, delay=delay, error=e)
+                tracing.current_span().add_event("retry", attempt=attempt, delay=delay, error=repr(e))
+            else:
+                latency = time.monotonic() - started
+                if breaker is not None:
+                    breaker.record(response.status < 500, latency)
+                if info is not None:
+                    # the body of a streamed response isn't read yet
+                    size = len(body) if body is not None else response.content_length
+                    self.hooks.emit(
+                        hooks.POST_RESPONSE, info, status=response.status,
+                        latency=latency, size=size)
+                retry_after = None
+                if response.status == 429:
+                    retry_after = ratelimit.parse_retry_after(response.headers.get("Retry-After"))
+                    if bucket is not None and retry_after:
+                        bucket.pause(retry_after)
+                if retry is None:
+                    return response, body
+                delay = retry.delay(method, attempt, response.status, retry_after)
+                if delay is None:
+                    return response, body
+                self.hooks.emit(hooks.RETRY, info, delay=delay)
+                tracing.current_span().add_event(
+                    "retry", attempt=attempt, delay=delay, status=response.status)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _parse(self, body):
+        return sync_api._parse(self._json_loads(body), self.get_timezone(), self.lazy)
+
+    def _timed_parse(self, body, info):
+        if info is None:
+            return self._parse(body)
+        started = time.perf_counter()
+        result = self._parse(body)
+        self.hooks.emit(hooks.POST_PARSE, info, parse_time=time.perf_counter() - started)
+        return result
+
+    async def run_batch(self, func, calls, max_concurrency=None):
+        """Await func once per (args, kwargs) pair of calls.
+
+        At most max_concurrency calls of this batch run at the same time,
+        on top of the client's own limit. Return one BatchResult per call
+        in order; a ChallongeException or a network error only fails the
+        call that raised it.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self._session_options["max_concurrency"])
+
+        async def call(args, kwargs):
+            async with semaphore:
+                try:
+                    return BatchResult(await func(*args, **kwargs), None)
+                except ITEM_ERRORS + (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    return BatchResult(None, e)
+
+        return await asyncio.gather(*[call(args, kwargs) for args, kwargs in calls])
+
+
+class _DefaultAsyncChallonge(AsyncChallonge):
+    """The client behind the module level coroutines, it follows the
+    credentials and timezone of the synchronous module functions."""
+
+    def __init__(self):
+        default = sync_api.get_default_client()
+        super(_DefaultAsyncChallonge, self).__init__(
+            rate_limit=default.rate_limiter, retry=default.retry,
+            circuit_breaker=default.circuit_breaker)
+        self._credentials = sync_api._credentials
+
+    # the rate limit, retry policy and circuit breaker are the ones of
+    # challonge.set_rate_limit(), set_retry_policy() and set_circuit_breaker()
+    @property
+    def rate_limiter(self):
+        return sync_api.get_default_client().rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter):
+        sync_api.get_default_client().rate_limiter = limiter
+
+    @property
+    def retry(self):
+        return sync_api.get_default_client().retry
+
+    @retry.setter
+    def retry(self, retry):
+        sync_api.get_default_client().retry = retry
+
+    @property
+    def circuit_breaker(self):
+        return sync_api.get_default_client().circuit_breaker
+
+    @circuit_breaker.setter
+    def circuit_breaker(self, breaker):
+        sync_api.get_default_client().circuit_breaker = breaker
+
+    # and so are the hooks of challonge.add_hook()
+    @property
+    def hooks(self):
+        return sync_api.get_default_client().hooks
+
+    @hooks.setter
+    def hooks(self, hooks):
+        # AsyncChallonge.__init__ sets new hooks, the default client's are
+        # kept
+        pass
+
+    def set_credentials(self, username, api_key):
+        sync_api.set_credentials(username, api_key)
+
+    def set_timezone(self, new_tz=None):
+        sync_api.set_timezone(new_tz)
+
+    def get_timezone(self):
+        return sync_api.get_timezone()
@@ -0,0 +1,87 @@
+from challonge import tracing
+from challonge.aio import api
+
+
+@tracing.traced
+async def index(tournament, **params):
+    """Retrieve a tournament's match list."""
+    return await api.fetch_and_parse(
+        "GET",
+        "tournaments/%s/matches" % tournament,
+        **params)
+
+
+@tracing.traced
+async def iter_index(tournament, **params):
+    """Iterate over a tournament's match list while it is downloaded.
+
+    Each match is yielded as soon as it is read, so huge brackets are
+    processed in constant memory.
+
+    """
+    async for match in api.fetch_and_iterate(
+            "GET",
+            "tournaments/%s/matches" % tournament,
+            **params):
+        yield match
+
+
+@tracing.traced
+async def show(tournament, match_id, **params):
+    """Retrieve a single match record for a tournament."""
+    return await api.fetch_and_parse(
+        "GET",
+        "tournaments/%s/matches/%s" % (tournament, match_id),
+        **params)
+
+
+@tracing.traced
+async def update(tournament, match_id, **params):
+    """Update/submit the score(s) for a match."""
+    await api.fetch(
+        "PUT",
+        "tournaments/%s/matches/%s" % (tournament, match_id),
+        "match",
+        **params)
+
+
+@tracing.traced
+async def reopen(tournament, match_id):
+    """Reopens a match that was marked completed, automatically resetting matches that follow it."""
+    await api.fetch(
+        "POST",
+        "tournaments/%s/matches/%s/reopen" % (tournament, match_id))
+
+
+@tracing.traced
+async def mark_as_underway(tournament, match_id):
+    """Sets "underway_at" to the current time and highlights the match in the bracket"""
+    await api.fetch(
+        "POST",
+        "tournaments/%s/matches/%s/mark_as_underway" % (tournament, match_id))
+
+
+@tracing.traced
+async def unmark_as_underway(tournament, match_id):
+    """Clears "underway_at" and unhighlights the match in the bracket"""
+    await api.fetch(
+        "POST",
+        "tournaments/%s/matches/%s/unmark_as_underway" % (tournament, match_id))
+
+
+@tracing.traced
+async def update_many(tournament, updates, max_concurrency=None):
+    """Update/submit the score(s) of several matches concurrently.
+
+    :param tournament: the tournament's name or id
+    :param updates: (match_id, params) pairs, params being the keyword
+        arguments of update()
+    :param max_concurrency: maximum number of updates running at the same time
+    :return: the outcome of each update, in order
+    :rtype: a list of challonge.batch.BatchResult
+
+    """
+    return await api.run_batch(
+        update,
+        [((tournament, match_id), params) for match_id, params in updates],
+        max_concurrency)
@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+
+from challonge import tracing
+from challonge.aio import api
+from challonge.tournaments import FIRST_DAY, _DAY, _as_date
+
+
+@tracing.traced
+async def index(**params):
+    """Retrieve a set of tournaments created with your account."""
+    return await api.fetch_and_parse("GET", "tournaments", **params)
+
+
+@tracing.traced
+async def iter_index(created_after=None, created_before=None, window=30, prefetch=False,
+                     **params):
+    """Iterate over the tournaments created with your account, newest first.
+
+    See ``challonge.tournaments.iter_index()``, with prefetch the next
+    window is fetched in a task while the current one is consumed.
+
+    """
+    start = _as_date(created_after) or FIRST_DAY
+    hi = _as_date(created_before) or datetime.date.today()
+    span = datetime.timedelta(days=window)
+    lo = max(start, hi - span + _DAY)
+
+    def get(lo, hi):
+        # the API's date filters may exclude their bounds, so ask for a
+        # day more on each side and drop the tournaments already seen
+        return index(created_after=lo - _DAY, created_before=hi + _DAY, **params)
+
+    task = asyncio.ensure_future(get(lo, hi)) if prefetch else None
+    seen = set()
+    try:
+        while hi >= start:
+            page = await task if prefetch else await get(lo, hi)
+            if not page:
+                span *= 2
+            else:
+                span = datetime.timedelta(days=window)
+            hi = lo - _DAY
+            lo = max(start, hi - span + _DAY)
+            task = asyncio.ensure_future(get(lo, hi)) if prefetch and hi >= start else None
+
+            for t in page:
+                if t["id"] not in seen:
+                    seen.add(t["id"])
+                    yield t
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+@tracing.traced
+async def create(name, url, tournament_type="single elimination", **params):
+    """Create a new tournament."""
+    params.update({
+        "name": name,
+        "url": url,
+        "tournament_type": tournament_type,
+    })
+
+    return await api.fetch_and_parse("POST", "tournaments", "tournament", **params)
+
+
+@tracing.traced
+async def show(tournament, **params):
+    """Retrieve a single tournament record created with your account."""
+    return await api.fetch_and_parse("GET", "tournaments/%s" % tournament, **params)
+
+
+@tracing.traced
+async def update(tournament, **params):
+    """Update a tournament's attributes."""
+    await api.fetch("PUT", "tournaments/%s" % tournament, "tournament", **params)
+
+
+@tracing.traced
+async def destroy(tournament):
+    """Deletes a tournament along with all its associated records.
+
+    There is no undo, so use with care!
+
+    """
+    await api.fetch("DELETE", "tournaments/%s" % tournament)
+
+
+@tracing.traced
+async def process_check_ins(tournament, **params):
+    """This should be invoked after a tournament's
+    check-in window closes before the tournament is started.
+
+    1) Marks participants who have not checked in as inactive.
+    2) Moves inactive participants to bottom seeds (ordered by original seed).
+    3) Transitions the tournament state from 'checking_in' to 'checked_in'
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/process_check_ins" % tournament,
+        **params)
+
+
+@tracing.traced
+async def abort_check_in(tournament, **params):
+    """When your tournament is in a 'checking_in' or 'checked_in' state,
+    there's no way to edit the tournament's start time (start_at)
+    or check-in duration (check_in_duration).
+    You must first abort check-in, then you may edit those attributes.
+
+    1) Makes all participants active and clears their checked_in_at times.
+    2) Transitions the tournament state from 'checking_in' or 'checked_in' to 'pending'
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/abort_check_in" % tournament,
+        **params)
+
+
+@tracing.traced
+async def open_for_predictions(tournament, **params):
+    """Open predictions for a tournament
+
+    Sets the state of the tournament to start accepting predictions.
+    'prediction_method' must be set to 1 (exponential scoring) or 2 (linear scoring) to use this option.
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/open_for_predictions" % tournament,
+        **params)
+
+
+@tracing.traced
+async def start(tournament, **params):
+    """Start a tournament, opening up matches for score reporting.
+
+    The tournament must have at least 2 participants.
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/start" % tournament,
+        **params)
+
+
+@tracing.traced
+async def finalize(tournament, **params):
+    """Finalize a tournament that has had all match scores submitted,
+    rendering its results permanent.
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/finalize" % tournament,
+        **params)
+
+
+@tracing.traced
+async def reset(tournament, **params):
+    """Reset a tournament, clearing all of its scores and attachments.
+
+    You can then add/remove/edit participants before starting the
+    tournament again.
+
+    """
+    return await api.fetch_and_parse(
+        "POST",
+        "tournaments/%s/reset" % tournament,
+        **params)
@@ -1,11 +1,12 @@
-import json
-import iso8601
+import importlib
 import tzlocal
 import pytz
 import itertools
 import sys
-from requests import request
-from requests.exceptions import HTTPError
+import threading
+from requests import Session
+from requests.adapters import HTTPAdapter
+from challonge import records, schema
 
 PY2 = sys.version_info[0] == 2
 TEXT_TYPE = unicode if PY2 else str
@@ -18,15 +19,52 @@ _credentials = {
     "api_key": None,
 }
 
+# (connect, read) timeouts in seconds, see the requests documentation
+DEFAULT_TIMEOUT = (3.05, 30)
+
+SESSION_DEFAULTS = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "timeout": DEFAULT_TIMEOUT,
+    "adapter": None,
+}
+
+# JSON decoders tried in order when no backend is chosen, all of them
+# accept the raw bytes of a response
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+_session_options = dict(SESSION_DEFAULTS)
+_json_loads = {}
+_default_client = None
+_default_client_lock = threading.Lock()
+
 
 class ChallongeException(Exception):
     pass
 
 
+def get_default_client():
+    """Return the client used by the module level functions.
+
+    It shares its credentials, timezone and session settings with
+    set_credentials(), set_timezone() and configure_session().
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                from challonge.client import Challonge
+                client = Challonge(timezone=tz)
+                client._credentials = _credentials
+                client._session_options = _session_options
+                _default_client = client
+    return _default_client
+
+
 def set_credentials(username, api_key):
     """Set the challonge.com api credentials to use."""
-    _credentials["user"] = username
-    _credentials["api_key"] = api_key
+    get_default_client().set_credentials(username, api_key)
 
 
 def set_timezone(new_tz=None):
@@ -45,15 +83,14 @@ def set_timezone(new_tz=None):
         None
     """
     global tz
-    if new_tz:
-        tz = pytz.timezone(new_tz)
-    else:
-        tz = tzlocal.get_localzone()
+    client = get_default_client()
+    client.set_timezone(new_tz)
+    tz = client.get_timezone()
 
 
 def get_credentials():
     """Retrieve the challonge.com credentials set with set_credentials()."""
-    return _credentials["user"], _credentials["api_key"]
+    return get_default_client().get_credentials()
 
 
 def get_timezone():
@@ -61,73 +98,235 @@ def get_timezone():
     return tz
 
 
-def fetch(method, uri, params_prefix=None, **params):
-    """Fetch the given uri and return the contents of the response."""
-    params = _prepare_params(params, params_prefix)
+def configure_session(**options):
+    """Change the connection pool used by fetch().
 
-    if method == "POST" or method == "PUT":
-        r_data = {"data": params}
-    else:
-        r_data = {"params": params}
+    :keyword param pool_connections: number of per-host pools to keep
+    :keyword param pool_maxsize: maximum number of connections kept
+        open to a single host
+    :keyword param pool_block: block instead of opening extra connections
+        when a host's pool is exhausted
+    :keyword param timeout: seconds to wait for the server, either a
+        single number or a (connect, read) tuple
+    :keyword param adapter: a requests transport adapter sending the
+        requests instead of the pool, e.g. a
+        challonge.cassette.RecordingAdapter or ReplayAdapter
+
+    The current session is closed and a new one is created with the
+    new settings on the next request.
+
+    :return
+        None
+    """
+    get_default_client().configure_session(**options)
+
+
+def set_rate_limit(rate_limit=None):
+    """Limit the requests per second of each username.
+
+    :keyword param rate_limit: requests per second, or a
+        challonge.ratelimit.RateLimiter shared with Challonge clients,
+        None removes the limit
+
+    :return
+        None
+    """
+    get_default_client().set_rate_limit(rate_limit)
+
+
+def set_retry_policy(retry=None):
+    """Retry throttled (429) and failed requests.
+
+    :keyword param retry: True, a number of retries or a
+        challonge.ratelimit.RetryPolicy, None to never retry
+
+    :return
+        None
+    """
+    get_default_client().set_retry_policy(retry)
 
-    # build the HTTP request and use basic authentication
-    url = "https://%s/%s.json" % (CHALLONGE_API_URL, uri)
 
-    try:
-        response = request(
-            method,
-            url,
-            auth=get_credentials(),
-            **r_data)
-        response.raise_for_status()
-    except HTTPError:
-        if response.status_code != 422:
-            response.raise_for_status()
-        # wrap up application-level errors
-        doc = response.json()
-        if doc.get("errors"):
-            raise ChallongeException(*doc['errors'])
+def set_circuit_breaker(breaker=None):
+    """Fail fast with challonge.circuit.CircuitOpenError while the API
+    keeps failing.
 
-    return response
+    :keyword param breaker: True or a challonge.circuit.CircuitBreaker,
+        None to always send requests
+
+    :return
+        None
+    """
+    get_default_client().set_circuit_breaker(breaker)
+
+
+def add_hook(event, func):
+    """Call func on an event of each request made by the module level
+    functions, see challonge.hooks.
+
+    :param event: 'pre_request', 'post_response', 'post_parse', 'error'
+        or 'retry'
+    :param func: called with the challonge.hooks.RequestInfo of the
+        request
+
+    :return
+        None
+    """
+    get_default_client().add_hook(event, func)
+
+
+def remove_hook(event, func):
+    """Stop calling func on event.
+
+    :return
+        None
+    """
+    get_default_client().remove_hook(event, func)
+
+
+def get_session():
+    """Return the pooled requests.Session used by fetch()."""
+    return get_default_client().get_session()
+
+
+def close_session():
+    """Close all pooled connections.
+
+    Long-running workers should call this on shutdown; a new session
+    is created transparently if fetch() is called again afterwards.
+    """
+    get_default_client().close()
+
+
+def set_json_backend(backend=None):
+    """Set the JSON decoder used by fetch_and_parse().
+
+    :keyword param backend: 'orjson', 'ujson' or 'json', by default the
+        first one installed in this order
+
+    :return
+        None
+    """
+    get_default_client().set_json_backend(backend)
+
+
+def get_json_loads(backend=None):
+    """Return the loads() function of a JSON backend.
+
+    Without backend return the one of the first backend of JSON_BACKENDS
+    which is installed.
+    """
+    if backend in _json_loads:
+        return _json_loads[backend]
+
+    if backend is None:
+        names = JSON_BACKENDS
+    elif backend in JSON_BACKENDS:
+        names = (backend,)
+    else:
+        raise ValueError("Unknown JSON backend: %s" % backend)
+
+    for name in names:
+        try:
+            loads = importlib.import_module(name).loads
+        except ImportError:
+            if backend is not None:
+                raise
+        else:
+            _json_loads[backend] = loads
+            return loads
+
+
+def fetch(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and return the contents of the response."""
+    return get_default_client().fetch(method, uri, params_prefix, **params)
 
 
 def fetch_and_parse(method, uri, params_prefix=None, **params):
     """Fetch the given uri and return python dictionary with parsed data-types."""
-    response = fetch(method, uri, params_prefix, **params)
-    return _parse(json.loads(response.text))
+    return get_default_client().fetch_and_parse(method, uri, params_prefix, **params)
+
+
+def fetch_and_iterate(method, uri, params_prefix=None, **params):
+    """Fetch the given uri and yield the parsed records of the list it
+    returns, each one as soon as it is read."""
+    return get_default_client().fetch_and_iterate(method, uri, params_prefix, **params)
+
+
+def _build_url(api_url, uri):
+    # api_url may include a scheme, e.g. to talk to a local server
+    if "://" not in api_url:
+        api_url = "https://" + api_url
+    return "%s/%s.json" % (api_url, uri)
+
+
+def run_batch(func, calls, max_workers=None):
+    """Run func once per (args, kwargs) pair of calls concurrently.
+
+    Return one challonge.batch.BatchResult per call, in order.
+    """
+    return get_default_client().run_batch(func, calls, max_workers)
+
+
+def _get_timezone(name=None):
+    if name is None:
+        return tzlocal.get_localzone()
+    if isinstance(name, TEXT_TYPE):
+        return pytz.timezone(name)
+    return name
+
+
+def _check_session_options(options):
+    unknown = set(options) - set(SESSION_DEFAULTS)
+    if unknown:
+        raise TypeError("Unknown session options: %s" % ", ".join(sorted(unknown)))
+
 
+def _build_session(options):
+    session = Session()
+    adapter = options["adapter"] or HTTPAdapter(
+        pool_connections=options["pool_connections"],
+        pool_maxsize=options["pool_maxsize"],
+        pool_block=options["pool_block"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-def _parse(data):
-    """Recursively convert a json into python data types"""
+
+def _parse(data, tz=None, lazy=False):
+    """Recursively convert a json into python data types
+
+    With lazy=True records are compact challonge.records objects
+    (Tournament, Match... or Record for other resources) which only
+    convert a field when it is read.
+    """
+    if tz is None:
+        tz = get_timezone()
 
     if not data:
         return []
     elif isinstance(data, (tuple, list)):
-        return [_parse(subdata) for subdata in data]
+        return [_parse(subdata, tz, lazy) for subdata in data]
+
+    if lazy:
+        if len(data) == 1:
+            (resource, record), = data.items()
+        else:
+            resource, record = None, {ik: v for k in data for ik, v in data[k].items()}
+        cls = records.RECORD_CLASSES.get(resource)
+        if cls is None:
+            return records.Record(record, schema.fields_of(resource), tz)
+        return cls(record, tz)
 
     # extract the nested dict. ex. {"tournament": {"url": "7k1safq" ...}}
-    d = {ik: v for k in data.keys() for ik, v in data[k].items()}
-
-    # convert datetime strings to datetime objects
-    # and float number strings to float
-    to_parse = dict(d)
-    for k, v in to_parse.items():
-        if k in {
-                "name",
-                "display_name",
-                "display_name_with_invitation_email_address",
-                "username",
-                "challonge_username"}:
-            continue # do not test type of fields which are always strings
-        if isinstance(v, TEXT_TYPE):
-            try:
-                dt = iso8601.parse_date(v)
-                d[k] = dt.astimezone(tz)
-            except iso8601.ParseError:
-                try:
-                    d[k] = float(v)
-                except ValueError:
-                    pass
+    # and convert datetime strings to datetime objects and float number
+    # strings to float, using the resource's field map when possible
+    d = {}
+    for resource, record in data.items():
+        fields = schema.fields_of(resource)
+        for k, v in record.items():
+            if isinstance(v, TEXT_TYPE):
+                v = records.convert(fields.get(k), v, tz)
+            d[k] = v
 
     return d
 
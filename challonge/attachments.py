@@ -1,6 +1,7 @@
-from challonge import api
+from challonge import api, tracing
 
 
+@tracing.traced
 def index(tournament, match):
     """Retrieve a set of attachments created for a specific match."""
     return api.fetch_and_parse(
@@ -8,6 +9,7 @@ def index(tournament, match):
         "tournaments/%s/matches/%s/attachments" % (tournament, match))
 
 
+@tracing.traced
 def create(tournament, match, **params):
     """Create a new attachment for the specific match."""
     return api.fetch_and_parse(
@@ -17,6 +19,7 @@ def create(tournament, match, **params):
         **params)
 
 
+@tracing.traced
 def show(tournament, match, attachment):
     """Retrieve a single match attachment record."""
     return api.fetch_and_parse(
@@ -24,6 +27,7 @@ def show(tournament, match, attachment):
         "tournaments/%s/matches/%s/attachments/%s" % (tournament, match, attachment))
 
 
+@tracing.traced
 def update(tournament, match, attachment, **params):
     """Update the attributes of a match attachment."""
     api.fetch(
@@ -33,6 +37,7 @@ def update(tournament, match, attachment, **params):
         **params)
 
 
+@tracing.traced
 def destroy(tournament, match, attachment):
     """Delete a match attachment."""
     api.fetch(
@@ -0,0 +1,55 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import RequestException
+
+from challonge import tracing
+from challonge.api import ChallongeException
+
+
+DEFAULT_MAX_WORKERS = 8
+
+# errors that only fail their own item instead of the whole batch
+ITEM_ERRORS = (ChallongeException, RequestException)
+
+
+class BatchResult(namedtuple("BatchResult", ["value", "error"])):
+    """The outcome of one call of a batch.
+
+    ``value`` is what the call returned and ``error`` the exception it
+    raised, if any.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def call(func, args, kwargs):
+    """Call func and wrap up its outcome in a BatchResult."""
+    try:
+        return BatchResult(func(*args, **kwargs), None)
+    except ITEM_ERRORS as e:
+        return BatchResult(None, e)
+
+
+def run(func, calls, max_workers=DEFAULT_MAX_WORKERS):
+    """Run func once per (args, kwargs) pair of calls in a thread pool.
+
+    At most max_workers calls run at the same time. Return a list of
+    BatchResult in the same order as calls; a ChallongeException or a
+    network error only fails the call that raised it.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+
+    workers = min(max_workers or DEFAULT_MAX_WORKERS, len(calls))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # each call gets its own copy of the context, so its spans are
+        # children of the current one
+        futures = [
+            executor.submit(tracing.run_in_context(call), func, args, kwargs)
+            for args, kwargs in calls]
+        return [f.result() for f in futures]
@@ -0,0 +1,228 @@
+"""A whole tournament, loaded at once and indexed."""
+from collections import namedtuple
+
+from challonge import api
+
+
+# a participant entering a match as player 1 or 2, None when the slot is
+# emptied
+Advance = namedtuple("Advance", ["match_id", "player", "participant_id"])
+
+# the predicted effects of reporting (winner_id set) or reopening
+# (winner_id None) a match
+Prediction = namedtuple("Prediction", ["match_id", "winner_id", "opened", "advances", "reset"])
+
+
+class Bracket(object):
+    """A tournament with its participants and matches, indexed for fast
+    lookups.
+
+    Participants are indexed by id, seed and group player id (the ids
+    matches use in group stages), matches by id, (group_id, identifier)
+    and round, and the matches of each participant are listed in
+    ``matches_by_participant``.
+
+    The lists and indexes are built once, a Bracket isn't updated when
+    the tournament changes.
+
+    :param tournament: the tournament record
+    :param participants: its participant records
+    :param matches: its match records
+    """
+
+    def __init__(self, tournament, participants, matches):
+        self.tournament = tournament
+        self.participants = participants
+        self.matches = matches
+
+        self.participants_by_id = {}
+        self.participants_by_seed = {}
+        self.participants_by_group_player_id = {}
+        for p in participants:
+            self.participants_by_id[p["id"]] = p
+            self.participants_by_seed[p.get("seed")] = p
+            for group_player_id in p.get("group_player_ids") or ():
+                self.participants_by_group_player_id[group_player_id] = p
+
+        self.matches_by_id = {}
+        self.matches_by_identifier = {}
+        self.matches_by_round = {}
+        self.matches_by_participant = {p["id"]: [] for p in participants}
+        self._graph = None
+        for m in matches:
+            self.matches_by_id[m["id"]] = m
+            self.matches_by_identifier[(m.get("group_id"), m.get("identifier"))] = m
+            self.matches_by_round.setdefault(m.get("round"), []).append(m)
+            for key in ("player1_id", "player2_id"):
+                p = self.participant(m.get(key))
+                if p is not None:
+                    self.matches_by_participant[p["id"]].append(m)
+
+    @classmethod
+    def from_tournament(cls, tournament, client=None):
+        """Build a Bracket from the result of tournaments.show() called
+        with include_participants=1 and include_matches=1.
+
+        :keyword param client: the client which fetched the tournament,
+            its timezone and lazy setting are used to parse the
+            participants and matches
+        """
+        client = client or api.get_default_client()
+        tz = client.get_timezone()
+        return cls(
+            tournament,
+            api._parse(tournament.get("participants") or [], tz, client.lazy),
+            api._parse(tournament.get("matches") or [], tz, client.lazy))
+
+    @property
+    def graph(self):
+        """The BracketGraph of the matches, built on first access."""
+        if self._graph is None:
+            self._graph = BracketGraph(self.matches)
+        return self._graph
+
+    def participant(self, participant_id):
+        """Return a participant by id or group player id, None if unknown."""
+        p = self.participants_by_id.get(participant_id)
+        if p is None:
+            p = self.participants_by_group_player_id.get(participant_id)
+        return p
+
+    def match(self, identifier, group_id=None):
+        """Return a match by identifier, e.g. "A", None if unknown."""
+        return self.matches_by_identifier.get((group_id, identifier))
+
+    def matches_of(self, participant_id):
+        """Return the matches of a participant (or group player)."""
+        p = self.participant(participant_id)
+        if p is None:
+            return []
+        return self.matches_by_participant[p["id"]]
+
+
+class BracketGraph(object):
+    """How the matches of an elimination bracket feed each other.
+
+    Built from the ``player*_prereq_match_id`` and
+    ``player*_is_prereq_match_loser`` fields of the matches, it predicts
+    locally what the API will do when a match is reported or reopened,
+    so a view can be updated right away and checked against the API
+    later::
+
+        prediction = bracket.graph.predict_report(match_id, winner_id)
+        client.matches.update(tournament_id, match_id, winner_id=winner_id,
+                              scores_csv="2-1")
+        bracket.graph.apply(prediction)
+        for match_id in prediction.opened:
+            notify(match_id)
+
+    The graph keeps its own copy of the players and states of the
+    matches, the records are never modified. Round robin and swiss
+    matches have no prerequisites, nothing is predicted for them.
+
+    :param matches: the match records of a tournament
+    """
+
+    def __init__(self, matches):
+        self.players = {}
+        self.states = {}
+        # match id -> [(dependent match id, player 1 or 2, loser?)]
+        self.dependents = {}
+        for m in matches:
+            self.players[m["id"]] = [m.get("player1_id"), m.get("player2_id")]
+            self.states[m["id"]] = m.get("state")
+            for player in (1, 2):
+                prereq = m.get("player%d_prereq_match_id" % player)
+                if prereq is not None:
+                    loser = bool(m.get("player%d_is_prereq_match_loser" % player))
+                    self.dependents.setdefault(prereq, []).append((m["id"], player, loser))
+
+    def downstream(self, match_id):
+        """Return the ids of the matches depending on a match, directly or
+        not, in breadth-first order."""
+        found = []
+        seen = {match_id}
+        queue = [match_id]
+        for current in queue:
+            for dependent, _, _ in self.dependents.get(current, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    found.append(dependent)
+                    queue.append(dependent)
+        return found
+
+    def predict_report(self, match_id, winner_id):
+        """Predict the effects of reporting winner_id as the winner of a
+        match: who enters which match and which matches become open.
+
+        A match fed twice by the same match, the grand finals reset of a
+        double elimination bracket, is only played when player 2 of that
+        match, coming from the losers bracket, wins it.
+        """
+        players = self.players[match_id]
+        if winner_id is None or winner_id not in players:
+            raise ValueError("%s doesn't play match %s" % (winner_id, match_id))
+        loser_id = players[1] if winner_id == players[0] else players[0]
+
+        advances = []
+        for dependent, player, loser in self.dependents.get(match_id, ()):
+            if self._is_reset(dependent, match_id) and winner_id != players[1]:
+                continue
+            advances.append(Advance(dependent, player, loser_id if loser else winner_id))
+        return Prediction(match_id, winner_id, self._opened(advances), advances, [])
+
+    def predict_reopen(self, match_id):
+        """Predict the effects of matches.reopen(): the matches depending
+        on this one are reset to pending and the players which came out of
+        reset matches are removed from the following ones."""
+        reset = [m for m in self.downstream(match_id) if self.states.get(m) != "pending"]
+        sources = {match_id}
+        sources.update(reset)
+        advances = []
+        for source in sources:
+            for dependent, player, _ in self.dependents.get(source, ()):
+                if self.players[dependent][player - 1] is not None:
+                    advances.append(Advance(dependent, player, None))
+        advances.sort()
+        return Prediction(match_id, None, [match_id], advances, reset)
+
+    def apply(self, prediction):
+        """Update the players and states of the graph with a prediction,
+        so the next predictions build on it."""
+        for match_id in prediction.reset:
+            self.states[match_id] = "pending"
+        for advance in prediction.advances:
+            self.players[advance.match_id][advance.player - 1] = advance.participant_id
+        for match_id in prediction.opened:
+            self.states[match_id] = "open"
+        if prediction.winner_id is not None:
+            self.states[prediction.match_id] = "complete"
+
+    def _is_reset(self, dependent, match_id):
+        return sum(1 for d, _, _ in self.dependents[match_id] if d == dependent) == 2
+
+    def _opened(self, advances):
+        opened = []
+        for advance in advances:
+            if advance.match_id in opened or self.states.get(advance.match_id) != "pending":
+                continue
+            players = list(self.players[advance.match_id])
+            for other in advances:
+                if other.match_id == advance.match_id:
+                    players[other.player - 1] = other.participant_id
+            if None not in players:
+                opened.append(advance.match_id)
+        return opened
+
+
+def load(tournament, client=None):
+    """Fetch a tournament with its participants and matches in a single
+    request and return a Bracket.
+
+    :param tournament: the tournament's name or id
+    :keyword param client: the challonge.Challonge to use, defaults to
+        the client of the module level functions
+    """
+    client = client or api.get_default_client()
+    t = client.tournaments.show(tournament, include_participants=1, include_matches=1)
+    return Bracket.from_tournament(t, client)
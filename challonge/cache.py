@@ -0,0 +1,157 @@
+"""An in-memory cache of parsed GET responses."""
+import threading
+import time
+from collections import OrderedDict
+
+from challonge import api
+
+
+# seconds a response stays fresh, by resource
+DEFAULT_TTLS = {
+    "tournaments": 30,
+    "participants": 10,
+    "matches": 5,
+    "attachments": 10,
+}
+
+MISSING = object()
+
+
+def request_key(uri, params, params_prefix=None):
+    """Return a hashable key identifying a request."""
+    return uri, tuple(api._prepare_params(params, params_prefix))
+
+
+def resource_of(uri):
+    """Return the resource an uri belongs to.
+
+    ex. "tournaments/10/matches/2/attachments" -> "attachments"
+    """
+    parts = uri.split("/")
+    if len(parts) >= 5 and parts[4] == "attachments":
+        return "attachments"
+    if len(parts) >= 3 and parts[2] in ("matches", "participants"):
+        return parts[2]
+    return "tournaments"
+
+
+def scope_of(uri):
+    """Return the tournament part of an uri, ex. "tournaments/10"."""
+    return "/".join(uri.split("/")[:2])
+
+
+class Generations(object):
+    """Counts the invalidations of each tournament.
+
+    A GET reads the generation of its uri before it is sent; if it
+    changed by the time the response is parsed, a write happened
+    meanwhile and the result may be stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = 0
+        self._counts = {}
+
+    def current(self, uri):
+        """Return the generation of uri, compared with == only."""
+        scope = scope_of(uri)
+        if scope == "tournaments":
+            # the tournaments index changes with every write
+            return self._total
+        return self._counts.get(scope, 0), self._counts.get("tournaments", 0)
+
+    def bump(self, uri):
+        """Record a write to uri."""
+        scope = scope_of(uri)
+        with self._lock:
+            self._total += 1
+            self._counts[scope] = self._counts.get(scope, 0) + 1
+
+
+class ResponseCache(object):
+    """A thread-safe LRU cache of parsed GET responses.
+
+    Entries expire after the TTL of their resource and the least recently
+    used entries are dropped once there are more than maxsize of them.
+    A client using the cache drops the entries of a tournament (and the
+    tournaments index) whenever it sends a write request for it.
+
+    Cached results are shared between callers and must not be modified.
+
+    :keyword param maxsize: maximum number of entries
+    :keyword param ttls: seconds entries of each resource stay fresh,
+        merged with DEFAULT_TTLS
+    :keyword param clock: function returning the current time in seconds
+    """
+
+    def __init__(self, maxsize=1024, ttls=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generations = Generations()
+
+    def __len__(self):
+        return len(self._entries)
+
+    key = staticmethod(request_key)
+
+    def get(self, key):
+        """Return the cached value of key or MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        """Cache value under key with the TTL of its resource.
+
+        :keyword param generation: the generation of the uri read when
+            the request was sent, the value isn't cached if it was
+            invalidated since
+        """
+        ttl = self.ttls.get(resource_of(key[0]), 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generations.current(key[0]):
+                return
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, uri):
+        """Drop the entries a write to uri may have changed.
+
+        Those are all the entries of the same tournament and the
+        tournaments index. A tournament referenced by id and by url is
+        seen as two different tournaments.
+        """
+        scope = scope_of(uri)
+        prefix = scope + "/"
+        with self._lock:
+            self.generations.bump(uri)
+            stale = [
+                key for key in self._entries
+                if key[0] == "tournaments" or key[0] == scope or key[0].startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
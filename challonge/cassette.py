@@ -0,0 +1,226 @@
+"""Recording API responses to a file and replaying them without network.
+
+A cassette is a file of request/response pairs, one JSON document per
+line, gzipped when its name ends with ".gz". Record a run with a
+RecordingAdapter and replay it with a ReplayAdapter, both are requests
+transport adapters given to the session::
+
+    with Cassette("run.jsonl.gz") as cassette:
+        client = challonge.Challonge("my_user", "my_api_key",
+                                     adapter=RecordingAdapter(cassette))
+        ...
+
+    cassette = Cassette("run.jsonl.gz")
+    client = challonge.Challonge("my_user", "my_api_key",
+                                 adapter=ReplayAdapter(cassette))
+
+Credentials and request headers aren't recorded. Requests are matched
+on their method, path, query string and body, identical requests get
+the recorded responses in order, the last one being repeated.
+"""
+import base64
+import datetime
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from challonge.api import ChallongeException
+
+
+# response headers kept in cassettes, the others describe the transport
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+class CassetteMissError(ChallongeException):
+    """Raised when a request being replayed wasn't recorded."""
+
+
+class Cassette(object):
+    """The request/response pairs of a file, loaded when it exists.
+
+    Interactions recorded are written to the file right away, close the
+    cassette when recording is done (a gzipped file is incomplete until
+    then).
+
+    :param path: the file, gzipped if its name ends with ".gz"
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._started = None
+        self._file = None
+        # (method, uri, body) -> the matching interactions, and the index
+        # of the next one to replay
+        self._index = {}
+        self._played = {}
+        if os.path.exists(path):
+            with self._open("rt") as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+
+    def _add(self, interaction):
+        self.interactions.append(interaction)
+        key = (interaction["method"], interaction["uri"], interaction["body"])
+        self._index.setdefault(key, []).append(interaction)
+
+    def _open(self, mode):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return io.open(self.path, mode, encoding="utf-8")
+
+    def record(self, request, response, elapsed):
+        """Append a request and its response, whose content is read, which
+        took elapsed seconds."""
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), None
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        interaction = {
+            "method": request.method,
+            "uri": _uri(request.url),
+            "body": _body(request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers},
+            "content": body,
+            "elapsed": round(elapsed, 6),
+        }
+        if encoding:
+            interaction["encoding"] = encoding
+        with self._lock:
+            now = time.monotonic()
+            if self._started is None:
+                self._started = now
+            interaction["at"] = round(now - self._started, 6)
+            self._add(interaction)
+            if self._file is None:
+                self._file = self._open("at")
+            self._file.write(json.dumps(interaction, sort_keys=True) + "\n")
+            self._file.flush()
+
+    def find(self, request):
+        """Return the next recorded interaction matching request, None if
+        there isn't any."""
+        key = (request.method, _uri(request.url), _body(request.body))
+        with self._lock:
+            matching = self._index.get(key)
+            if not matching:
+                return None
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            return matching[min(index, len(matching) - 1)]
+
+    def close(self):
+        """Close the file recorded to."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def rewind(self):
+        """Replay the interactions from the beginning."""
+        with self._lock:
+            self._played = {}
+
+
+class RecordingAdapter(BaseAdapter):
+    """Send requests with another adapter and record their responses.
+
+    The body of streamed responses is read at once to be recorded.
+
+    :param cassette: the Cassette to record to
+    :keyword param adapter: the adapter sending the requests, by default
+        a new HTTPAdapter
+    """
+
+    def __init__(self, cassette, adapter=None):
+        super(RecordingAdapter, self).__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = self.adapter.send(request, **kwargs)
+        # read the body within the time measured
+        response.content
+        self.cassette.record(request, response, time.monotonic() - started)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answer requests with the responses of a cassette, without network.
+
+    :param cassette: the Cassette to replay
+    :keyword param speed: None to answer right away, otherwise responses
+        are delayed by their recorded latency divided by speed, 1 to
+        reproduce it
+    """
+
+    def __init__(self, cassette, speed=None):
+        super(ReplayAdapter, self).__init__()
+        self.cassette = cassette
+        self.speed = speed
+
+    def send(self, request, **kwargs):
+        interaction = self.cassette.find(request)
+        if interaction is None:
+            raise CassetteMissError(
+                "No recorded response for %s %s" % (request.method, _uri(request.url)))
+        if self.speed:
+            time.sleep(interaction["elapsed"] / self.speed)
+
+        content = interaction["content"]
+        if interaction.get("encoding") == "base64":
+            content = base64.b64decode(content)
+        else:
+            content = content.encode("utf-8")
+
+        response = Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction.get("reason")
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response._content_consumed = True
+        response.elapsed = datetime.timedelta(seconds=interaction["elapsed"])
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def _uri(url):
+    # the host is left out, a cassette can be replayed with any api_url
+    parts = urlsplit(url)
+    return parts.path + ("?" + parts.query if parts.query else "")
+
+
+def _body(body):
+    if isinstance(body, bytes):
+        return body.decode("utf-8", "replace")
+    return body
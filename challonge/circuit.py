@@ -0,0 +1,95 @@
+"""Failing fast while the API is down."""
+import threading
+import time
+
+from challonge.api import ChallongeException
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ChallongeException):
+    """Raised instead of sending a request while the circuit is open.
+
+    ``retry_in`` is the number of seconds before a probe request is let
+    through.
+    """
+
+    def __init__(self, retry_in):
+        super(CircuitOpenError, self).__init__(
+            "The API is failing, requests are refused for %.1f more seconds" % retry_in)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker(object):
+    """A thread-safe circuit breaker.
+
+    The circuit opens after ``failures`` consecutive failed requests:
+    network errors, 5xx responses and, with slow_call set, responses
+    which took longer than slow_call seconds. While it is open requests
+    fail right away with CircuitOpenError. After reset_timeout seconds
+    the circuit is half-open and one probe request is sent every
+    reset_timeout seconds; the first one to succeed closes the circuit.
+
+    A breaker can be shared by several clients talking to the same API.
+
+    :keyword param failures: consecutive failures opening the circuit
+    :keyword param reset_timeout: seconds between probes while the
+        circuit is open
+    :keyword param slow_call: seconds after which a response counts as
+        a failure, None to ignore latency
+    :keyword param clock: function returning the current time in seconds
+    """
+
+    def __init__(self, failures=5, reset_timeout=30, slow_call=None, clock=time.monotonic):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.slow_call = slow_call
+        self.state = CLOSED
+        self._clock = clock
+        self._failed = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = self._clock()
+            retry_in = self._opened_at + self.reset_timeout - now
+            if retry_in > 0:
+                raise CircuitOpenError(retry_in)
+            # let this request probe the API, the others wait for the
+            # next probe
+            self.state = HALF_OPEN
+            self._opened_at = now
+
+    def record(self, ok, duration=0):
+        """Record the outcome of a request sent after before()."""
+        if ok and self.slow_call is not None and duration > self.slow_call:
+            ok = False
+        with self._lock:
+            if ok:
+                self.state = CLOSED
+                self._failed = 0
+                return
+            self._failed += 1
+            if self.state == HALF_OPEN or self._failed >= self.failures:
+                self.state = OPEN
+                self._opened_at = self._clock()
+
+    def reset(self):
+        """Close the circuit."""
+        with self._lock:
+            self.state = CLOSED
+            self._failed = 0
+
+
+def circuit_breaker(breaker):
+    """Return a CircuitBreaker from True or None."""
+    if breaker is True:
+        return CircuitBreaker()
+    return breaker or None
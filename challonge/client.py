@@ -0,0 +1,427 @@
+import threading
+import time
+import types
+from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError, Timeout
+
+from challonge import (
+    api,
+    batch,
+    circuit,
+    hooks,
+    ratelimit,
+    streaming,
+    tracing,
+    tournaments,
+    matches,
+    participants,
+    attachments)
+from challonge.cache import MISSING, Generations, request_key
+from challonge.conditional import ValidatorCache
+from challonge.singleflight import SingleFlight
+
+
+class Challonge(object):
+    """A challonge.com API client.
+
+    Each client owns its credentials, timezone and connection pool, so
+    several accounts can be used side by side in the same process::
+
+        client = challonge.Challonge("my_user", "my_api_key", timezone="UTC")
+        tournament = client.tournaments.show(3272)
+        client.matches.index(tournament["id"])
+
+    The resource modules are available as ``client.tournaments``,
+    ``client.matches``, ``client.participants`` and ``client.attachments``
+    with the same functions and signatures as the module level ones.
+
+    A client can be shared between threads.
+
+    :keyword param username: challonge.com username
+    :keyword param api_key: challonge.com api key
+    :keyword param timezone: timezone string or tzinfo for datetime
+        fields, defaults to your machine's timezone
+    :keyword param lazy: return challonge.records.Record objects which
+        convert datetime and float fields on first access
+    :keyword param json_backend: 'orjson', 'ujson' or 'json', by default
+        the fastest one installed
+    :keyword param api_url: host and path of the API, defaults to
+        ``challonge.api.CHALLONGE_API_URL``; https is used unless it
+        starts with another scheme
+    :keyword param cache: a challonge.cache.ResponseCache for GET requests,
+        writes made through the client invalidate the related entries
+    :keyword param store: a challonge.store.TournamentStore, GET requests
+        of complete tournaments are answered from it
+    :keyword param conditional: send conditional GET requests and return
+        the previous result when nothing changed, True or a
+        challonge.conditional.ValidatorCache
+    :keyword param coalesce: let concurrent identical GET requests share a
+        single HTTP request and parsed result
+    :keyword param rate_limit: requests per second per username, or a
+        challonge.ratelimit.RateLimiter shared with other clients
+    :keyword param retry: retry throttled and failed requests, True, a
+        number of retries or a challonge.ratelimit.RetryPolicy
+    :keyword param circuit_breaker: fail fast with
+        challonge.circuit.CircuitOpenError while the API keeps failing,
+        True or a challonge.circuit.CircuitBreaker
+    :keyword param batch_workers: default number of threads used by the
+        ``*_many`` batch functions
+    :keyword param session_options: connection pool settings, see
+        ``configure_session()``
+    """
+
+    def __init__(self, username=None, api_key=None, timezone=None,
+                 lazy=False, json_backend=None, api_url=None, cache=None,
+                 store=None, conditional=False, coalesce=False, rate_limit=None,
+                 retry=None, circuit_breaker=None,
+                 batch_workers=batch.DEFAULT_MAX_WORKERS, **session_options):
+        api._check_session_options(session_options)
+
+        self._lock = threading.RLock()
+        self._credentials = {"user": username, "api_key": api_key}
+        self._tz = api._get_timezone(timezone)
+        self._session_options = dict(api.SESSION_DEFAULTS, **session_options)
+        self._session = None
+        self.api_url = api_url
+        self.lazy = lazy
+        self.set_json_backend(json_backend)
+        self.batch_workers = batch_workers
+        self.cache = cache
+        self.store = store
+        self.validators = _validator_cache(conditional)
+        self.coalesce = coalesce
+        self._flights = SingleFlight()
+        self._generations = Generations()
+        self.set_rate_limit(rate_limit)
+        self.set_retry_policy(retry)
+        self.set_circuit_breaker(circuit_breaker)
+        self.hooks = hooks.Hooks()
+
+        self.tournaments = _Resource(self, tournaments)
+        self.matches = _Resource(self, matches)
+        self.participants = _Resource(self, participants)
+        self.attachments = _Resource(self, attachments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set_credentials(self, username, api_key):
+        """Set the challonge.com api credentials to use."""
+        with self._lock:
+            self._credentials["user"] = username
+            self._credentials["api_key"] = api_key
+
+    def get_credentials(self):
+        """Retrieve the challonge.com credentials in use."""
+        with self._lock:
+            return self._credentials["user"], self._credentials["api_key"]
+
+    def set_timezone(self, new_tz=None):
+        """Set the timezone for datetime fields.
+
+        If it's called without parameter sets the local time again.
+        """
+        self._tz = api._get_timezone(new_tz or None)
+
+    def get_timezone(self):
+        """Return currently timezone in use."""
+        return self._tz
+
+    def set_json_backend(self, backend=None):
+        """Set the JSON decoder, see ``challonge.api.set_json_backend()``."""
+        self._json_loads = api.get_json_loads(backend)
+
+    def set_rate_limit(self, rate_limit=None):
+        """Limit the requests per second of each username, None to remove
+        the limit."""
+        self.rate_limiter = ratelimit.rate_limiter(rate_limit)
+
+    def set_retry_policy(self, retry=None):
+        """Set when failed requests are sent again, None to never retry."""
+        self.retry = ratelimit.retry_policy(retry)
+
+    def set_circuit_breaker(self, breaker=None):
+        """Set the circuit breaker, True for a default one, None to always
+        send requests."""
+        self.circuit_breaker = circuit.circuit_breaker(breaker)
+
+    def add_hook(self, event, func):
+        """Call func(info) on an event of each request, see
+        challonge.hooks."""
+        self.hooks.add(event, func)
+
+    def remove_hook(self, event, func):
+        """Stop calling func on event."""
+        self.hooks.remove(event, func)
+
+    def configure_session(self, **options):
+        """Change the connection pool, see ``challonge.configure_session()``."""
+        api._check_session_options(options)
+        with self._lock:
+            self._session_options.update(options)
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def get_session(self):
+        """Return the pooled requests.Session used by this client."""
+        with self._lock:
+            if self._session is None:
+                self._session = api._build_session(self._session_options)
+            return self._session
+
+    def close(self):
+        """Close all pooled connections.
+
+        The client stays usable, a new session is created on the next
+        request.
+        """
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def fetch(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return the contents of the response."""
+        return self._request(method, uri, params_prefix, params)
+
+    def fetch_and_parse(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and return python dictionary with parsed data-types."""
+        info = self.hooks.start(method, uri)
+        if method != "GET" or not self._get_layers():
+            response = self._request(method, uri, params_prefix, params, info=info)
+            return self._timed_parse(response.content, info)
+
+        key = request_key(uri, params, params_prefix)
+        generation = None
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not MISSING:
+                return result
+            generation = self.cache.generations.current(uri)
+        if self.coalesce:
+            # requests started before a write to the tournament aren't
+            # joined, their result may not include it
+            flight = key, self._generations.current(uri)
+            return self._flights.do(
+                flight, self._get, key, uri, params_prefix, params, info, generation)
+        return self._get(key, uri, params_prefix, params, info, generation)
+
+    def fetch_and_iterate(self, method, uri, params_prefix=None, **params):
+        """Fetch the given uri and yield the parsed records of the list it
+        returns, each one as soon as it is read.
+
+        The body is read in chunks, so the memory used doesn't depend on
+        the length of the list. The response isn't cached or stored.
+        """
+        response = self._request(method, uri, params_prefix, params, stream=True)
+        try:
+            chunks = response.iter_content(streaming.CHUNK_SIZE)
+            for element in streaming.iter_array(chunks):
+                yield self._parse(element)
+        finally:
+            response.close()
+
+    def _get(self, key, uri, params_prefix, params, info=None, generation=None):
+        store = self.store
+        body = store.get(key) if store is not None else None
+        from_store = body is not None
+        if from_store:
+            result = self._parse(body)
+        elif self.validators is None:
+            body = self._request("GET", uri, params_prefix, params, info=info).content
+            result = self._timed_parse(body, info)
+        else:
+            previous = self.validators.get(key)
+            response = self._request(
+                "GET", uri, params_prefix, params,
+                previous.headers() if previous is not None else None, info=info)
+            body = response.content if response.status_code != 304 else None
+            result = self.validators.update(
+                key, previous, response.status_code, response.headers,
+                response.content, lambda body: self._timed_parse(body, info))
+
+        if store is not None and body is not None and not from_store:
+            store.observe(key, body, result)
+
+        if self.cache is not None:
+            self.cache.set(key, result, generation)
+        return result
+
+    def _get_layers(self):
+        # whether GET requests go through any of the optional layers
+        return (self.cache is not None or self.store is not None or
+                self.validators is not None or self.coalesce)
+
+    def _request(self, method, uri, params_prefix, params, headers=None, stream=False,
+                 info=None):
+        params = api._prepare_params(params, params_prefix)
+        if info is None:
+            info = self.hooks.start(method, uri)
+
+        if method == "POST" or method == "PUT":
+            r_data = {"data": params}
+        else:
+            r_data = {"params": params}
+        if stream:
+            r_data["stream"] = True
+
+        # build the HTTP request and use basic authentication
+        url = api._build_url(self.api_url or api.CHALLONGE_API_URL, uri)
+
+        span = tracing.request_span(method, uri)
+        try:
+            with span:
+                try:
+                    response = self._send(method, url, headers, r_data, info)
+                    span.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                except HTTPError:
+                    if response.status_code != 422:
+                        response.raise_for_status()
+                    # wrap up application-level errors
+                    doc = response.json()
+                    if doc.get("errors"):
+                        raise api.ChallongeException(*doc['errors'])
+        except Exception as e:
+            self.hooks.emit(hooks.ERROR, info, error=e)
+            raise
+        finally:
+            if method != "GET":
+                self._generations.bump(uri)
+                if self.cache is not None:
+                    self.cache.invalidate(uri)
+                if self.store is not None:
+                    self.store.invalidate(uri)
+
+        return response
+
+    def _send(self, method, url, headers, r_data, info=None):
+        # send a request within the rate limit, retrying it as the retry
+        # policy allows, and return the last response
+        credentials = self.get_credentials()
+        limiter, retry, breaker = self.rate_limiter, self.retry, self.circuit_breaker
+        bucket = limiter.bucket(credentials[0]) if limiter is not None else None
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before()
+            if bucket is not None:
+                bucket.acquire()
+            self.hooks.emit(hooks.PRE_REQUEST, info, attempt=attempt)
+            started = time.monotonic()
+            try:
+                response = self.get_session().request(
+                    method,
+                    url,
+                    auth=credentials,
+                    headers=headers,
+                    timeout=self._session_options["timeout"],
+                    **r_data)
+            except (ConnectionError, Timeout) as e:
+                if breaker is not None:
+                    breaker.record(False)
+                if retry is None:
+                    raise
+                # only a connect timeout tells the request wasn't sent
+                delay = retry.delay(method, attempt, sent=not isinstance(e, ConnectTimeout))
+                if delay is None:
+                    raise
+                self.hooks.emit(hooks.RETRY, info, delay=delay, error=e)
+                tracing.current_span().add_event("retry", attempt=attempt, delay=delay, error=repr(e))
+            else:
+                latency = time.monotonic() - started
+                if breaker is not None:
+                    breaker.record(response.status_code < 500, latency)
+                if info is not None:
+                    self.hooks.emit(
+                        hooks.POST_RESPONSE, info, status=response.status_code,
+                        latency=latency, size=_size(response, r_data.get("stream")))
+                retry_after = None
+                if response.status_code == 429:
+                    retry_after = ratelimit.parse_retry_after(response.headers.get("Retry-After"))
+                    if bucket is not None and retry_after:
+                        bucket.pause(retry_after)
+                if retry is None:
+                    return response
+                delay = retry.delay(method, attempt, response.status_code, retry_after)
+                if delay is None:
+                    return response
+                self.hooks.emit(hooks.RETRY, info, delay=delay)
+                tracing.current_span().add_event(
+                    "retry", attempt=attempt, delay=delay, status=response.status_code)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _parse(self, body):
+        return api._parse(self._json_loads(body), self._tz, self.lazy)
+
+    def _timed_parse(self, body, info):
+        if info is None:
+            return self._parse(body)
+        started = time.perf_counter()
+        result = self._parse(body)
+        self.hooks.emit(hooks.POST_PARSE, info, parse_time=time.perf_counter() - started)
+        return result
+
+    def run_batch(self, func, calls, max_workers=None):
+        """Run func once per (args, kwargs) pair of calls in a thread pool.
+
+        Return one challonge.batch.BatchResult per call, in order.
+        """
+        return batch.run(func, calls, max_workers or self.batch_workers)
+
+
+def _size(response, stream):
+    # the body of a streamed response isn't read yet
+    if not stream:
+        return len(response.content)
+    length = response.headers.get("Content-Length")
+    return int(length) if length is not None else None
+
+
+def _validator_cache(conditional):
+    if conditional is True:
+        return ValidatorCache()
+    return conditional or None
+
+
+class _Resource(object):
+    """The functions of a resource module bound to a client.
+
+    Every function is re-created with the module's globals, except that
+    ``api`` refers to the client, so calls made through it (including
+    calls between functions of the same module) use the client's
+    credentials, timezone and session. Functions decorated with
+    tracing.traced are re-created from ``__wrapped__`` and decorated
+    again.
+    """
+
+    def __init__(self, client, module):
+        self.__name__ = module.__name__
+        namespace = dict(vars(module), api=client)
+        for name, value in vars(module).items():
+            if not isinstance(value, types.FunctionType):
+                continue
+            if value.__module__ != module.__name__:
+                continue
+            func = getattr(value, "__wrapped__", value)
+            bound = types.FunctionType(
+                func.__code__,
+                namespace,
+                name,
+                func.__defaults__,
+                func.__closure__)
+            bound.__doc__ = func.__doc__
+            bound.__kwdefaults__ = func.__kwdefaults__
+            if func is not value:
+                bound = tracing.traced(bound)
+            namespace[name] = bound
+            if not name.startswith("_"):
+                setattr(self, name, bound)
+
+    def __repr__(self):
+        return "<%s bound resource>" % self.__name__
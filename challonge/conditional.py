@@ -0,0 +1,88 @@
+"""Validators of GET responses for conditional requests."""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+
+class Validators(namedtuple("Validators", ["etag", "last_modified", "digest", "result"])):
+    """What is known about the last response to a GET request.
+
+    ``digest`` is a hash of the body, used to detect unchanged responses
+    when the server sends neither ETag nor Last-Modified, and ``result``
+    the parsed body.
+    """
+    __slots__ = ()
+
+    def headers(self):
+        """Return the headers making a request conditional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def digest(body):
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ValidatorCache(object):
+    """A thread-safe LRU map of request keys to Validators.
+
+    Clients using it send conditional GET requests and return the
+    previously parsed result, without parsing again, when the server
+    answers 304 Not Modified or sends the same body again. Callers can
+    thus detect that nothing changed with ``result is previous_result``.
+
+    :keyword param maxsize: maximum number of requests to remember
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the Validators of a request key, or None."""
+        with self._lock:
+            validators = self._entries.get(key)
+            if validators is not None:
+                self._entries.move_to_end(key)
+            return validators
+
+    def set(self, key, validators):
+        with self._lock:
+            self._entries[key] = validators
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def update(self, key, previous, status, headers, body, parse):
+        """Return the result of a response to a conditional request.
+
+        :param previous: the Validators the request was sent with, or None
+        :param status: the HTTP status of the response
+        :param headers: the headers of the response
+        :param body: the body of the response
+        :param parse: function parsing body
+        """
+        if status == 304 and previous is not None:
+            self.set(key, previous)
+            return previous.result
+
+        body_digest = digest(body)
+        if previous is not None and previous.digest == body_digest:
+            result = previous.result
+        else:
+            result = parse(body)
+        self.set(key, Validators(
+            headers.get("ETag"), headers.get("Last-Modified"), body_digest, result))
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,857 @@
+"""A local stand-in for the challonge.com v1 API.
+
+The emulator serves the endpoints used by the tournaments, participants,
+matches and attachments modules from memory, on localhost, so code using
+pychal can be tested, load-tested and benchmarked without credentials or
+network::
+
+    with Emulator(latency=0.05) as emulator:
+        client = challonge.Challonge("user", "key", api_url=emulator.url)
+        t = client.tournaments.create("cup", "cup")
+
+or for the module level functions::
+
+    challonge.api.CHALLONGE_API_URL = emulator.url
+
+Single elimination and round robin tournaments can be started; matches
+progress through the bracket as they are reported and reopened.
+Invalid requests get 422 responses with the API's ``{"errors": [...]}``
+body.
+"""
+import base64
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from challonge import schema
+from challonge.bracket import BracketGraph
+
+
+class _Error(Exception):
+
+    def __init__(self, status, *errors):
+        super(_Error, self).__init__(*errors)
+        self.status = status
+        self.errors = list(errors)
+
+
+def _not_found(resource):
+    return _Error(404, "Requested %s not found" % resource)
+
+
+class Emulator(object):
+    """An in-memory challonge.com API served over HTTP on localhost.
+
+    :keyword param host: interface to listen on
+    :keyword param port: port to listen on, by default a free one
+    :keyword param latency: seconds each request is delayed, or a
+        (minimum, maximum) range to pick from
+    :keyword param error_rate: fraction of the requests answered with
+        error_status instead of being handled
+    :keyword param error_status: status of the injected errors, 429 and
+        503 responses have a Retry-After header
+    :keyword param credentials: {username: api_key} accepted by the
+        emulator, by default any credentials are
+    :keyword param seed: seed of the random choices, for reproducible
+        runs
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0, error_rate=0,
+                 error_status=500, credentials=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.credentials = credentials
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.emulator = self
+        self._thread = None
+        self.reset()
+
+    @property
+    def url(self):
+        """The value of api_url or CHALLONGE_API_URL for this emulator."""
+        host, port = self._server.server_address[:2]
+        return "http://%s:%s/v1" % (host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), name="challonge-emulator")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        """Forget every tournament."""
+        with self._lock:
+            self.tournaments = {}
+            self._ids = {}
+
+    # requests
+
+    def handle(self, method, path, params, auth=None):
+        """Answer a request and return (status, headers, document).
+
+        This is what the HTTP server calls, it can also be used directly
+        to measure the emulator without the network.
+        """
+        with self._lock:
+            self.requests += 1
+            injected = self.error_rate and self._random.random() < self.error_rate
+        self._sleep()
+        if injected:
+            headers = {}
+            if self.error_status in (429, 503):
+                headers["Retry-After"] = "1"
+            return self.error_status, headers, {"errors": ["Injected error"]}
+        if self.credentials is not None and (
+                auth is None or self.credentials.get(auth[0]) != auth[1]):
+            return 401, {}, {"errors": ["Invalid credentials"]}
+
+        uri = path.split("/v1/", 1)[-1].strip("/")
+        if uri.endswith(".json"):
+            uri = uri[:-5]
+        for route_method, pattern, name in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(uri)
+            if match is None:
+                continue
+            try:
+                with self._lock:
+                    return 200, {}, getattr(self, name)(params, *match.groups())
+            except _Error as e:
+                return e.status, {}, {"errors": e.errors}
+        return 404, {}, {"errors": ["No route matches %s %s" % (method, uri)]}
+
+    def _sleep(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            with self._lock:
+                latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _next_id(self, resource):
+        self._ids[resource] = self._ids.get(resource, 0) + 1
+        return self._ids[resource]
+
+    # tournaments
+
+    def _tournament(self, ident):
+        for t in self.tournaments.values():
+            record = t.record
+            if ident in (str(record["id"]), record["url"]):
+                return t
+            if record["subdomain"] and ident == "%s-%s" % (record["subdomain"], record["url"]):
+                return t
+        raise _not_found("tournament")
+
+    def index_tournaments(self, params):
+        state = params.get("state", "all")
+        states = {
+            "pending": ("pending", "checking_in", "checked_in", "accepting_predictions"),
+            "in_progress": ("underway", "group_stages_underway", "awaiting_review"),
+            "ended": ("complete",),
+        }.get(state)
+        after = _date(params.get("created_after"))
+        before = _date(params.get("created_before"))
+        result = []
+        for t in self.tournaments.values():
+            record = t.record
+            created = _date(record["created_at"][:10])
+            if states is not None and record["state"] not in states:
+                continue
+            if params.get("type") and record["tournament_type"] != params["type"].replace("_", " "):
+                continue
+            if after is not None and created < after or before is not None and created > before:
+                continue
+            result.append({"tournament": record})
+        return result
+
+    def create_tournament(self, params):
+        attrs = params.get("tournament", {})
+        if not attrs.get("name"):
+            raise _Error(422, "Name can't be blank")
+        url = attrs.get("url") or "t%d" % (self._ids.get("tournament", 0) + 1)
+        if any(t.record["url"] == url for t in self.tournaments.values()):
+            raise _Error(422, "URL is already taken")
+        t = _Tournament(self._next_id("tournament"), attrs)
+        self.tournaments[t.record["id"]] = t
+        return t.show({})
+
+    def show_tournament(self, params, ident):
+        return self._tournament(ident).show(params)
+
+    def update_tournament(self, params, ident):
+        t = self._tournament(ident)
+        t.update(params.get("tournament", {}))
+        return t.show({})
+
+    def destroy_tournament(self, params, ident):
+        t = self._tournament(ident)
+        del self.tournaments[t.record["id"]]
+        return t.show({})
+
+    def tournament_action(self, params, ident, action):
+        t = self._tournament(ident)
+        getattr(t, action)(self)
+        return t.show(params)
+
+    # participants
+
+    def index_participants(self, params, ident):
+        return [{"participant": p} for p in self._tournament(ident).sorted_participants()]
+
+    def create_participant(self, params, ident):
+        t = self._tournament(ident)
+        return {"participant": t.add_participant(self, params.get("participant", {}))}
+
+    def bulk_add_participants(self, params, ident):
+        t = self._tournament(ident)
+        return [{"participant": t.add_participant(self, attrs)}
+                for attrs in params.get("participants", [])]
+
+    def randomize_participants(self, params, ident):
+        t = self._tournament(ident)
+        t.randomize(self._random)
+        return [{"participant": p} for p in t.sorted_participants()]
+
+    def show_participant(self, params, ident, participant_id):
+        return {"participant": self._tournament(ident).participant(participant_id)}
+
+    def update_participant(self, params, ident, participant_id):
+        t = self._tournament(ident)
+        p = t.participant(participant_id)
+        t.update_participant(p, params.get("participant", {}))
+        return {"participant": p}
+
+    def destroy_participant(self, params, ident, participant_id):
+        t = self._tournament(ident)
+        return {"participant": t.destroy_participant(t.participant(participant_id))}
+
+    def participant_action(self, params, ident, participant_id, action):
+        t = self._tournament(ident)
+        p = t.participant(participant_id)
+        p["checked_in"] = action == "check_in"
+        p["checked_in_at"] = _now() if p["checked_in"] else None
+        _touch(p)
+        return {"participant": p}
+
+    # matches
+
+    def index_matches(self, params, ident):
+        t = self._tournament(ident)
+        state = params.get("state", "all")
+        participant_id = params.get("participant_id")
+        result = []
+        for m in t.matches:
+            if state != "all" and m["state"] != state:
+                continue
+            if participant_id and int(participant_id) not in (m["player1_id"], m["player2_id"]):
+                continue
+            result.append({"match": m})
+        return result
+
+    def show_match(self, params, ident, match_id):
+        return {"match": self._tournament(ident).match(match_id)}
+
+    def update_match(self, params, ident, match_id):
+        t = self._tournament(ident)
+        m = t.match(match_id)
+        t.update_match(m, params.get("match", {}))
+        return {"match": m}
+
+    def match_action(self, params, ident, match_id, action):
+        t = self._tournament(ident)
+        m = t.match(match_id)
+        if action == "reopen":
+            t.reopen(m)
+        else:
+            m["underway_at"] = _now() if action == "mark_as_underway" else None
+            _touch(m)
+        return {"match": m}
+
+    # attachments
+
+    def index_attachments(self, params, ident, match_id):
+        t = self._tournament(ident)
+        t.match(match_id)
+        return [{"match_attachment": a} for a in t.attachments.get(int(match_id), [])]
+
+    def create_attachment(self, params, ident, match_id):
+        t = self._tournament(ident)
+        m = t.match(match_id)
+        attrs = params.get("match_attachment", {})
+        if not (attrs.get("url") or attrs.get("description") or attrs.get("asset")):
+            raise _Error(422, "At least one of asset, url or description must be provided")
+        now = _now()
+        a = {
+            "id": self._next_id("attachment"),
+            "match_id": m["id"],
+            "user_id": 1,
+            "description": attrs.get("description"),
+            "url": attrs.get("url"),
+            "original_file_name": None,
+            "created_at": now,
+            "updated_at": now,
+            "asset_file_name": None,
+            "asset_content_type": None,
+            "asset_file_size": None,
+            "asset_url": None,
+        }
+        t.attachments.setdefault(m["id"], []).append(a)
+        m["attachment_count"] = len(t.attachments[m["id"]])
+        m["has_attachment"] = True
+        return {"match_attachment": a}
+
+    def show_attachment(self, params, ident, match_id, attachment_id):
+        return {"match_attachment": self._tournament(ident).attachment(match_id, attachment_id)}
+
+    def update_attachment(self, params, ident, match_id, attachment_id):
+        a = self._tournament(ident).attachment(match_id, attachment_id)
+        for key in ("url", "description"):
+            if key in params.get("match_attachment", {}):
+                a[key] = params["match_attachment"][key]
+        _touch(a)
+        return {"match_attachment": a}
+
+    def destroy_attachment(self, params, ident, match_id, attachment_id):
+        t = self._tournament(ident)
+        a = t.attachment(match_id, attachment_id)
+        attachments = t.attachments[a["match_id"]]
+        attachments.remove(a)
+        m = t.match(match_id)
+        m["attachment_count"] = len(attachments)
+        m["has_attachment"] = bool(attachments)
+        return {"match_attachment": a}
+
+
+class _Tournament(object):
+
+    def __init__(self, tournament_id, attrs):
+        now = _now()
+        self.record = {
+            "id": tournament_id,
+            "name": None,
+            "url": None,
+            "subdomain": None,
+            "description": "",
+            "tournament_type": "single elimination",
+            "state": "pending",
+            "private": False,
+            "open_signup": False,
+            "hold_third_place_match": False,
+            "accept_attachments": False,
+            "prediction_method": 0,
+            "progress_meter": 0,
+            "participants_count": 0,
+            "check_in_duration": None,
+            "start_at": None,
+            "started_at": None,
+            "completed_at": None,
+            "started_checking_in_at": None,
+            "locked_at": None,
+            "pts_for_match_win": "1.0",
+            "pts_for_match_tie": "0.5",
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.update(attrs)
+        self.record["url"] = self.record["url"] or "t%d" % tournament_id
+        self.record["full_challonge_url"] = "https://challonge.com/%s" % self.record["url"]
+        self.participants = []
+        self.matches = []
+        self.attachments = {}
+        self.graph = None
+
+    def show(self, params):
+        record = dict(self.record)
+        if _true(params.get("include_participants")):
+            record["participants"] = [{"participant": p} for p in self.sorted_participants()]
+        if _true(params.get("include_matches")):
+            record["matches"] = [{"match": m} for m in self.matches]
+        return {"tournament": record}
+
+    def update(self, attrs):
+        for key, value in attrs.items():
+            self.record[key] = _value(schema.TOURNAMENT, key, value)
+        _touch(self.record)
+
+    def _require(self, *states):
+        if self.record["state"] not in states:
+            raise _Error(422, "This action isn't available while the tournament is %s"
+                         % self.record["state"].replace("_", " "))
+
+    # state changes
+
+    def start(self, emulator):
+        self._require("pending", "checking_in", "checked_in", "accepting_predictions")
+        players = [p for p in self.sorted_participants() if p["active"]]
+        if len(players) < 2:
+            raise _Error(422, "Tournament must have at least 2 participants")
+        kind = self.record["tournament_type"]
+        if kind == "single elimination":
+            self._single_elimination(emulator, players)
+        elif kind == "round robin":
+            self._round_robin(emulator, players)
+        else:
+            raise _Error(422, "The emulator can't start %s tournaments" % kind)
+        for n, m in enumerate(self.matches):
+            m["identifier"] = _identifier(n)
+            m["suggested_play_order"] = n + 1
+        self.graph = BracketGraph(self.matches)
+        self.record["state"] = "underway"
+        self.record["started_at"] = _now()
+        _touch(self.record)
+
+    def finalize(self, emulator):
+        self._require("underway", "awaiting_review")
+        if any(m["state"] != "complete" for m in self.matches):
+            raise _Error(422, "All matches must be complete before finalizing")
+        self.record["state"] = "complete"
+        self.record["completed_at"] = _now()
+        self.record["progress_meter"] = 100
+        _touch(self.record)
+
+    def reset(self, emulator):
+        self.matches = []
+        self.attachments = {}
+        self.graph = None
+        for p in self.participants:
+            p["active"] = True
+            p["final_rank"] = None
+        self.record.update(state="pending", started_at=None, completed_at=None, progress_meter=0)
+        _touch(self.record)
+
+    def process_check_ins(self, emulator):
+        self._require("pending", "checking_in")
+        for p in self.participants:
+            if not p["checked_in"]:
+                p["active"] = False
+        self.record["state"] = "checked_in"
+        _touch(self.record)
+
+    def abort_check_in(self, emulator):
+        self._require("checking_in", "checked_in")
+        for p in self.participants:
+            p.update(active=True, checked_in=False, checked_in_at=None)
+        self.record["state"] = "pending"
+        _touch(self.record)
+
+    def open_for_predictions(self, emulator):
+        self._require("pending")
+        self.record["state"] = "accepting_predictions"
+        _touch(self.record)
+
+    # participants
+
+    def sorted_participants(self):
+        return sorted(self.participants, key=lambda p: p["seed"])
+
+    def participant(self, participant_id):
+        for p in self.participants:
+            if str(p["id"]) == participant_id:
+                return p
+        raise _not_found("participant")
+
+    def add_participant(self, emulator, attrs):
+        if self.record["state"] not in ("pending", "checking_in", "checked_in"):
+            raise _Error(422, "Participants can't be added once the tournament has started")
+        if not (attrs.get("name") or attrs.get("challonge_username") or attrs.get("email")):
+            raise _Error(422, "Name can't be blank")
+        now = _now()
+        p = {
+            "id": emulator._next_id("participant"),
+            "tournament_id": self.record["id"],
+            "name": None,
+            "seed": len(self.participants) + 1,
+            "active": True,
+            "misc": None,
+            "icon": None,
+            "final_rank": None,
+            "on_waiting_list": False,
+            "invitation_id": None,
+            "group_id": None,
+            "checked_in": False,
+            "checked_in_at": None,
+            "challonge_username": None,
+            "group_player_ids": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.participants.append(p)
+        seed = attrs.pop("seed", None)
+        self.update_participant(p, attrs)
+        if seed is not None:
+            self._move(p, int(seed))
+        self._count()
+        return p
+
+    def update_participant(self, p, attrs):
+        seed = attrs.get("seed")
+        for key, value in attrs.items():
+            if key != "seed":
+                p[key] = _value(schema.PARTICIPANT, key, value)
+        if p["name"] is None:
+            p["name"] = p.get("challonge_username") or p.get("email")
+        if seed is not None:
+            self._move(p, int(seed))
+        _touch(p)
+
+    def destroy_participant(self, p):
+        if self.record["state"] == "pending":
+            self.participants.remove(p)
+            for other in self.participants:
+                if other["seed"] > p["seed"]:
+                    other["seed"] -= 1
+            self._count()
+            return p
+
+        # forfeit the matches left to play
+        p["active"] = False
+        _touch(p)
+        for m in self.matches:
+            if m["state"] == "open" and p["id"] in (m["player1_id"], m["player2_id"]):
+                winner = m["player2_id"] if m["player1_id"] == p["id"] else m["player1_id"]
+                self.report(m, winner, forfeited=True)
+        return p
+
+    def randomize(self, rnd):
+        self._require("pending")
+        seeds = list(range(1, len(self.participants) + 1))
+        rnd.shuffle(seeds)
+        for p, seed in zip(self.participants, seeds):
+            p["seed"] = seed
+
+    def _move(self, p, seed):
+        seed = max(1, min(seed, len(self.participants)))
+        others = [o for o in self.sorted_participants() if o is not p]
+        others.insert(seed - 1, p)
+        for n, o in enumerate(others):
+            o["seed"] = n + 1
+
+    def _count(self):
+        self.record["participants_count"] = len(self.participants)
+
+    # matches
+
+    def match(self, match_id):
+        for m in self.matches:
+            if str(m["id"]) == str(match_id):
+                return m
+        raise _not_found("match")
+
+    def attachment(self, match_id, attachment_id):
+        self.match(match_id)
+        for a in self.attachments.get(int(match_id), []):
+            if str(a["id"]) == attachment_id:
+                return a
+        raise _not_found("attachment")
+
+    def _new_match(self, emulator, round, player1=None, player2=None):
+        now = _now()
+        m = {
+            "id": emulator._next_id("match"),
+            "tournament_id": self.record["id"],
+            "identifier": None,
+            "round": round,
+            "state": "pending",
+            "player1_id": None,
+            "player2_id": None,
+            "player1_prereq_match_id": None,
+            "player2_prereq_match_id": None,
+            "player1_is_prereq_match_loser": False,
+            "player2_is_prereq_match_loser": False,
+            "winner_id": None,
+            "loser_id": None,
+            "scores_csv": "",
+            "forfeited": None,
+            "group_id": None,
+            "location": None,
+            "underway_at": None,
+            "started_at": None,
+            "completed_at": None,
+            "suggested_play_order": None,
+            "attachment_count": None,
+            "has_attachment": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for n, source in ((1, player1), (2, player2)):
+            if isinstance(source, dict):
+                m["player%d_prereq_match_id" % n] = source["id"]
+            else:
+                m["player%d_id" % n] = source
+        if m["player1_id"] is not None and m["player2_id"] is not None:
+            m["state"] = "open"
+            m["started_at"] = now
+        self.matches.append(m)
+        return m
+
+    def _single_elimination(self, emulator, players):
+        size = 1
+        while size < len(players):
+            size *= 2
+        order = [1]
+        while len(order) < size:
+            order = [s for seed in order for s in (seed, 2 * len(order) + 1 - seed)]
+
+        # a slot is a participant id (a bye) or the match its player comes from
+        slots = []
+        for a, b in zip(order[::2], order[1::2]):
+            if b > len(players):
+                slots.append(players[a - 1]["id"])
+            else:
+                slots.append(self._new_match(emulator, 1, players[a - 1]["id"], players[b - 1]["id"]))
+        round = 2
+        semi_finals = None
+        while len(slots) > 1:
+            if len(slots) == 2:
+                semi_finals = slots
+            slots = [self._new_match(emulator, round, a, b) for a, b in zip(slots[::2], slots[1::2])]
+            round += 1
+
+        if self.record["hold_third_place_match"] and semi_finals and all(
+                isinstance(s, dict) for s in semi_finals):
+            m = self._new_match(emulator, 0, *semi_finals)
+            m["player1_is_prereq_match_loser"] = m["player2_is_prereq_match_loser"] = True
+
+    def _round_robin(self, emulator, players):
+        ids = [p["id"] for p in players]
+        if len(ids) % 2:
+            ids.append(None)
+        for round in range(1, len(ids)):
+            half = len(ids) // 2
+            for a, b in zip(ids[:half], reversed(ids[half:])):
+                if a is not None and b is not None:
+                    self._new_match(emulator, round, a, b)
+            ids.insert(1, ids.pop())
+
+    def update_match(self, m, attrs):
+        if "scores_csv" in attrs:
+            m["scores_csv"] = attrs["scores_csv"]
+        for key in ("player1_votes", "player2_votes"):
+            if key in attrs:
+                m[key] = _value(schema.MATCH, key, attrs[key])
+        winner = attrs.get("winner_id")
+        if winner is not None:
+            if m["state"] == "pending":
+                raise _Error(422, "Match is not open")
+            if winner == "tie":
+                if self.record["tournament_type"] == "single elimination":
+                    raise _Error(422, "Ties aren't allowed in elimination matches")
+                self._complete(m, None, None)
+            else:
+                if m["state"] == "complete":
+                    raise _Error(422, "Reopen the match to change its winner")
+                winner = int(winner)
+                if winner not in (m["player1_id"], m["player2_id"]):
+                    raise _Error(422, "Winner ID must be one of the match's participants")
+                self.report(m, winner)
+        _touch(m)
+
+    def report(self, m, winner, forfeited=None):
+        prediction = self.graph.predict_report(m["id"], winner)
+        self.graph.apply(prediction)
+        loser = m["player2_id"] if winner == m["player1_id"] else m["player1_id"]
+        self._complete(m, winner, loser)
+        m["forfeited"] = forfeited
+        self._sync(prediction)
+        self._progress()
+
+    def reopen(self, m):
+        if m["state"] != "complete":
+            raise _Error(422, "Only complete matches can be reopened")
+        if self.graph is None:
+            raise _Error(422, "The tournament isn't underway")
+        prediction = self.graph.predict_reopen(m["id"])
+        self.graph.apply(prediction)
+        for match_id in prediction.reset:
+            reset = self.match(match_id)
+            reset.update(state="pending", winner_id=None, loser_id=None, scores_csv="",
+                         completed_at=None, underway_at=None, started_at=None)
+        m.update(state="open", winner_id=None, loser_id=None, completed_at=None)
+        self._sync(prediction)
+        self._progress()
+
+    def _complete(self, m, winner, loser):
+        m.update(state="complete", winner_id=winner, loser_id=loser, completed_at=_now())
+        if self.graph is not None:
+            self.graph.states[m["id"]] = "complete"
+
+    def _sync(self, prediction):
+        # copy the changes predicted by the graph to the match records
+        for advance in prediction.advances:
+            dependent = self.match(advance.match_id)
+            dependent["player%d_id" % advance.player] = advance.participant_id
+            _touch(dependent)
+        for match_id in prediction.opened:
+            opened = self.match(match_id)
+            if opened["state"] == "pending":
+                opened.update(state="open", started_at=_now())
+                _touch(opened)
+
+    def _progress(self):
+        done = sum(1 for m in self.matches if m["state"] == "complete")
+        self.record["progress_meter"] = done * 100 // len(self.matches) if self.matches else 0
+        _touch(self.record)
+
+
+_T = r"tournaments/([^/]+)"
+_ROUTES = [(method, re.compile(pattern + "$"), name) for method, pattern, name in [
+    ("GET", r"tournaments", "index_tournaments"),
+    ("POST", r"tournaments", "create_tournament"),
+    ("GET", _T, "show_tournament"),
+    ("PUT", _T, "update_tournament"),
+    ("DELETE", _T, "destroy_tournament"),
+    ("POST", _T + r"/(start|finalize|reset|process_check_ins|abort_check_in|"
+                  r"open_for_predictions)", "tournament_action"),
+    ("GET", _T + r"/participants", "index_participants"),
+    ("POST", _T + r"/participants", "create_participant"),
+    ("POST", _T + r"/participants/bulk_add", "bulk_add_participants"),
+    ("POST", _T + r"/participants/randomize", "randomize_participants"),
+    ("GET", _T + r"/participants/(\d+)", "show_participant"),
+    ("PUT", _T + r"/participants/(\d+)", "update_participant"),
+    ("DELETE", _T + r"/participants/(\d+)", "destroy_participant"),
+    ("POST", _T + r"/participants/(\d+)/(check_in|undo_check_in)", "participant_action"),
+    ("GET", _T + r"/matches", "index_matches"),
+    ("GET", _T + r"/matches/(\d+)", "show_match"),
+    ("PUT", _T + r"/matches/(\d+)", "update_match"),
+    ("POST", _T + r"/matches/(\d+)/(reopen|mark_as_underway|unmark_as_underway)",
+     "match_action"),
+    ("GET", _T + r"/matches/(\d+)/attachments", "index_attachments"),
+    ("POST", _T + r"/matches/(\d+)/attachments", "create_attachment"),
+    ("GET", _T + r"/matches/(\d+)/attachments/(\d+)", "show_attachment"),
+    ("PUT", _T + r"/matches/(\d+)/attachments/(\d+)", "update_attachment"),
+    ("DELETE", _T + r"/matches/(\d+)/attachments/(\d+)", "destroy_attachment"),
+]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, don't let them wait for
+    # an acknowledgement
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        pairs = parse_qsl(url.query, keep_blank_values=True)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            pairs += parse_qsl(body, keep_blank_values=True)
+
+        status, headers, document = self.server.emulator.handle(
+            self.command, url.path, _parse_params(pairs), self._auth())
+
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_PUT = do_DELETE = do_GET
+
+    def _auth(self):
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return None
+        try:
+            user, _, key = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+        except ValueError:
+            return None
+        return user, key
+
+
+def _parse_params(pairs):
+    # "tournament[name]" -> {"tournament": {"name": ...}},
+    # "participants[][name]" -> {"participants": [{"name": ...}, ...]}
+    params = {}
+    for key, value in pairs:
+        base, _, rest = key.partition("[")
+        parts = re.findall(r"([^\[\]]*)\]", rest) if rest else []
+        if not parts:
+            params[base] = value
+        elif parts == [""]:
+            params.setdefault(base, []).append(value)
+        elif len(parts) == 1:
+            params.setdefault(base, {})[parts[0]] = value
+        elif parts[0] == "":
+            items = params.setdefault(base, [])
+            if not items or parts[1] in items[-1]:
+                items.append({})
+            items[-1][parts[1]] = value
+        else:
+            params.setdefault(base, {}).setdefault(parts[0], []).append(value)
+    return params
+
+
+def _value(fields, key, value):
+    # form values are strings, give known fields the API's types
+    if fields.get(key) != schema.VALUE or not isinstance(value, str):
+        return value
+    if value in ("true", "false"):
+        return value == "true"
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _true(value):
+    return value in ("1", "true", True, 1)
+
+
+def _date(value):
+    if not value:
+        return None
+    return datetime.datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+
+def _now():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.isoformat(timespec="milliseconds")
+
+
+def _touch(record):
+    record["updated_at"] = _now()
+
+
+def _identifier(n):
+    # A, B, ... Z, AA, AB, ...
+    letters = ""
+    n += 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
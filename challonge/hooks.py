@@ -0,0 +1,246 @@
+"""Functions called on the events of API requests, for metrics.
+
+A hook is registered for one event and called with the RequestInfo of
+the request, in the thread or task making the request::
+
+    def log(info):
+        print(info.method, info.template, info.status, info.latency, info.size)
+
+    client.add_hook("post_response", log)
+
+The events of a request are, in order:
+
+- ``pre_request`` before each attempt is sent
+- ``post_response`` when a response is received, with its status,
+  latency in seconds and size in bytes
+- ``retry`` when an attempt failed and will be retried after ``delay``
+- ``post_parse`` when fetch_and_parse() decoded the body, with
+  ``parse_time`` in seconds
+- ``error`` when the call raises ``error``
+
+Requests answered by a cache, the store or a coalesced request have no
+events. Exceptions raised by hooks are logged to the challonge.hooks
+logger and don't affect the request: a broken metrics hook mustn't make
+a write which succeeded look like it failed.
+"""
+import logging
+import math
+import threading
+
+
+PRE_REQUEST = "pre_request"
+POST_RESPONSE = "post_response"
+POST_PARSE = "post_parse"
+ERROR = "error"
+RETRY = "retry"
+EVENTS = (PRE_REQUEST, POST_RESPONSE, POST_PARSE, ERROR, RETRY)
+
+log = logging.getLogger(__name__)
+
+# the segment following these ones is an id
+_ID_NAMES = {
+    "tournaments": "{tournament}",
+    "participants": "{participant}",
+    "matches": "{match}",
+    "attachments": "{attachment}",
+}
+
+
+def uri_template(uri):
+    """Return uri with its ids replaced by placeholders, e.g.
+    tournaments/{tournament}/matches/{match} for tournaments/cup/matches/12.
+
+    Any segment after "tournaments" is a tournament id or url, the other
+    ids are numbers, "participants/bulk_add" is kept as is.
+    """
+    parts = uri.split("/")
+    for i in range(1, len(parts)):
+        name = _ID_NAMES.get(parts[i - 1])
+        if name is not None and (name == "{tournament}" or parts[i].isdigit()):
+            parts[i] = name
+    return "/".join(parts)
+
+
+class RequestInfo(object):
+    """What is known of a request when a hook is called.
+
+    The same object is passed to every hook of a request, fields are
+    None until they are known and keep their values from one attempt to
+    the next.
+    """
+
+    __slots__ = ("event", "method", "uri", "template", "attempt", "status",
+                 "latency", "size", "parse_time", "delay", "error")
+
+    def __init__(self, method, uri):
+        self.event = None
+        self.method = method
+        self.uri = uri
+        self.template = uri_template(uri)
+        self.attempt = 0
+        self.status = None
+        self.latency = None
+        self.size = None
+        self.parse_time = None
+        self.delay = None
+        self.error = None
+
+    def __repr__(self):
+        return "<RequestInfo %s %s %s>" % (self.event, self.method, self.uri)
+
+
+class Hooks(object):
+    """The hooks of a client, by event.
+
+    Hooks can be added and removed while requests are made from other
+    threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # event -> tuple of functions, replaced as a whole on changes so
+        # requests can read it without the lock
+        self._hooks = {}
+
+    def __bool__(self):
+        return bool(self._hooks)
+
+    def add(self, event, func):
+        """Call func(info) on event."""
+        if event not in EVENTS:
+            raise ValueError("Unknown event: %s" % event)
+        with self._lock:
+            hooks = dict(self._hooks)
+            hooks[event] = hooks.get(event, ()) + (func,)
+            self._hooks = hooks
+
+    def remove(self, event, func):
+        """Stop calling func on event."""
+        with self._lock:
+            hooks = dict(self._hooks)
+            funcs = list(hooks.get(event, ()))
+            funcs.remove(func)
+            if funcs:
+                hooks[event] = tuple(funcs)
+            else:
+                hooks.pop(event, None)
+            self._hooks = hooks
+
+    def start(self, method, uri):
+        """Return the RequestInfo of a new request, None without hooks so
+        requests cost nothing more."""
+        if not self._hooks:
+            return None
+        return RequestInfo(method, uri)
+
+    def emit(self, event, info, **fields):
+        """Update the fields of info and call the hooks of event."""
+        if info is None:
+            return
+        for name, value in fields.items():
+            setattr(info, name, value)
+        funcs = self._hooks.get(event)
+        if funcs:
+            info.event = event
+            for func in funcs:
+                try:
+                    func(info)
+                except Exception:
+                    log.exception("%s hook %r failed", event, func)
+
+
+class _Series(object):
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyHistogram(object):
+    """Latency percentiles of each endpoint, kept in memory for an
+    exporter to read::
+
+        histogram = LatencyHistogram()
+        client.add_hook("post_response", histogram.observe)
+        ...
+        for endpoint, stats in histogram.snapshot().items():
+            export(endpoint, stats["p50"], stats["p99"])
+
+    Endpoints are named after the method and URI template, e.g.
+    "GET tournaments/{tournament}/matches". Values are counted in
+    buckets growing by 2 ** (1 / precision), the percentiles are the
+    upper bounds of buckets: with the default precision they are at
+    most 19% above the exact ones.
+
+    :keyword param field: the RequestInfo field observed, "latency" on
+        post_response or "parse_time" on post_parse
+    :keyword param precision: buckets per doubling of the value
+    """
+
+    # values below a microsecond share the first bucket
+    MINIMUM = 1e-6
+
+    def __init__(self, field="latency", precision=4):
+        self.field = field
+        self.precision = precision
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, info):
+        """Count the field of a RequestInfo, to be used as a hook."""
+        value = getattr(info, self.field)
+        if value is None:
+            return
+        key = "%s %s" % (info.method, info.template)
+        if value > self.MINIMUM:
+            bucket = int(math.ceil(math.log(value / self.MINIMUM, 2) * self.precision))
+        else:
+            bucket = 0
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.buckets[bucket] = series.buckets.get(bucket, 0) + 1
+            series.count += 1
+            series.total += value
+            series.max = max(series.max, value)
+
+    def percentile(self, endpoint, q):
+        """Return the q-th percentile (0 to 100) of an endpoint, None
+        without values."""
+        with self._lock:
+            series = self._series.get(endpoint)
+            if series is None:
+                return None
+            return self._percentile(series, q)
+
+    def _percentile(self, series, q):
+        rank = max(1, int(math.ceil(series.count * q / 100.0)))
+        seen = 0
+        for bucket in sorted(series.buckets):
+            seen += series.buckets[bucket]
+            if seen >= rank:
+                return min(self.MINIMUM * 2 ** (bucket / float(self.precision)), series.max)
+        return series.max
+
+    def snapshot(self):
+        """Return {endpoint: {"count", "mean", "p50", "p90", "p99", "max"}}."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": series.count,
+                    "mean": series.total / series.count,
+                    "p50": self._percentile(series, 50),
+                    "p90": self._percentile(series, 90),
+                    "p99": self._percentile(series, 99),
+                    "max": series.max,
+                }
+                for endpoint, series in self._series.items()}
+
+    def reset(self):
+        """Forget the values observed."""
+        with self._lock:
+            self._series = {}
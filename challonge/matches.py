@@ -1,6 +1,7 @@
-from challonge import api
+from challonge import api, tracing
 
 
+@tracing.traced
 def index(tournament, **params):
     """Retrieve a tournament's match list."""
     return api.fetch_and_parse(
@@ -9,6 +10,21 @@ def index(tournament, **params):
         **params)
 
 
+@tracing.traced
+def iter_index(tournament, **params):
+    """Iterate over a tournament's match list while it is downloaded.
+
+    Each match is yielded as soon as it is read, so huge brackets are
+    processed in constant memory.
+
+    """
+    return api.fetch_and_iterate(
+        "GET",
+        "tournaments/%s/matches" % tournament,
+        **params)
+
+
+@tracing.traced
 def show(tournament, match_id, **params):
     """Retrieve a single match record for a tournament."""
     return api.fetch_and_parse(
@@ -17,6 +33,7 @@ def show(tournament, match_id, **params):
         **params)
 
 
+@tracing.traced
 def update(tournament, match_id, **params):
     """Update/submit the score(s) for a match."""
     api.fetch(
@@ -26,6 +43,7 @@ def update(tournament, match_id, **params):
         **params)
 
 
+@tracing.traced
 def reopen(tournament, match_id):
     """Reopens a match that was marked completed, automatically resetting matches that follow it."""
     api.fetch(
@@ -33,6 +51,7 @@ def reopen(tournament, match_id):
         "tournaments/%s/matches/%s/reopen" % (tournament, match_id))
 
 
+@tracing.traced
 def mark_as_underway(tournament, match_id):
     """Sets "underway_at" to the current time and highlights the match in the bracket"""
     api.fetch(
@@ -40,9 +59,27 @@ def mark_as_underway(tournament, match_id):
         "tournaments/%s/matches/%s/mark_as_underway" % (tournament, match_id))
 
 
+@tracing.traced
 def unmark_as_underway(tournament, match_id):
     """Clears "underway_at" and unhighlights the match in the bracket"""
     api.fetch(
         "POST",
         "tournaments/%s/matches/%s/unmark_as_underway" % (tournament, match_id))
 
+
+@tracing.traced
+def update_many(tournament, updates, max_workers=None):
+    """Update/submit the score(s) of several matches concurrently.
+
+    :param tournament: the tournament's name or id
+    :param updates: (match_id, params) pairs, params being the keyword
+        arguments of update()
+    :param max_workers: maximum number of updates running at the same time
+    :return: the outcome of each update, in order
+    :rtype: a list of challonge.batch.BatchResult
+
+    """
+    return api.run_batch(
+        update,
+        [((tournament, match_id), params) for match_id, params in updates],
+        max_workers)
@@ -1,6 +1,7 @@
-from challonge import api
+from challonge import api, tracing
 
 
+@tracing.traced
 def index(tournament):
     """Retrieve a tournament's participant list."""
     return api.fetch_and_parse(
@@ -8,6 +9,16 @@ def index(tournament):
         "tournaments/%s/participants" % tournament)
 
 
+@tracing.traced
+def iter_index(tournament):
+    """Iterate over a tournament's participant list while it is
+    downloaded, in constant memory."""
+    return api.fetch_and_iterate(
+        "GET",
+        "tournaments/%s/participants" % tournament)
+
+
+@tracing.traced
 def create(tournament, name, **params):
     """Add a participant to a tournament."""
     params.update({"name": name})
@@ -19,6 +30,7 @@ def create(tournament, name, **params):
         **params)
 
 
+@tracing.traced
 def bulk_add(tournament, names, **params):
     """Bulk add participants to a tournament (up until it is started).
 
@@ -39,6 +51,7 @@ def bulk_add(tournament, names, **params):
         **params)
 
 
+@tracing.traced
 def show(tournament, participant_id, **params):
     """Retrieve a single participant record for a tournament."""
     return api.fetch_and_parse(
@@ -47,6 +60,7 @@ def show(tournament, participant_id, **params):
         **params)
 
 
+@tracing.traced
 def update(tournament, participant_id, **params):
     """Update the attributes of a tournament participant."""
     api.fetch(
@@ -56,6 +70,7 @@ def update(tournament, participant_id, **params):
         **params)
 
 
+@tracing.traced
 def check_in(tournament, participant_id):
     """Checks a participant in."""
     api.fetch(
@@ -63,6 +78,7 @@ def check_in(tournament, participant_id):
         "tournaments/%s/participants/%s/check_in" % (tournament, participant_id))
 
 
+@tracing.traced
 def undo_check_in(tournament, participant_id):
     """Marks a participant as having not checked in."""
     api.fetch(
@@ -70,6 +86,7 @@ def undo_check_in(tournament, participant_id):
         "tournaments/%s/participants/%s/undo_check_in" % (tournament, participant_id))
 
 
+@tracing.traced
 def destroy(tournament, participant_id):
     """Destroys or deactivates a participant.
 
@@ -85,6 +102,7 @@ def destroy(tournament, participant_id):
         "tournaments/%s/participants/%s" % (tournament, participant_id))
 
 
+@tracing.traced
 def randomize(tournament):
     """Randomize seeds among participants.
 
@@ -92,3 +110,30 @@ def randomize(tournament):
 
     """
     api.fetch("POST", "tournaments/%s/participants/randomize" % tournament)
+
+
+@tracing.traced
+def check_in_many(tournament, participant_ids, max_workers=None):
+    """Checks several participants in concurrently.
+
+    Return a challonge.batch.BatchResult per participant, in order.
+
+    """
+    return api.run_batch(
+        check_in,
+        [((tournament, participant_id), {}) for participant_id in participant_ids],
+        max_workers)
+
+
+@tracing.traced
+def destroy_many(tournament, participant_ids, max_workers=None):
+    """Destroys or deactivates several participants concurrently.
+
+    See destroy(). Return a challonge.batch.BatchResult per participant,
+    in order.
+
+    """
+    return api.run_batch(
+        destroy,
+        [((tournament, participant_id), {}) for participant_id in participant_ids],
+        max_workers)
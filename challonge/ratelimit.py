@@ -0,0 +1,171 @@
+"""Request budgets and retries."""
+import email.utils
+import random
+import threading
+import time
+
+
+# methods which can be sent again without changing the result
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# statuses worth retrying, 429 is retried whatever the method since the
+# request was refused without being processed
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket.
+
+    Tokens are added at ``rate`` per second, up to ``burst`` of them. Each
+    request takes one or more tokens; when the bucket runs dry callers
+    wait until enough tokens have been added again.
+
+    :param rate: tokens added per second
+    :keyword param burst: maximum number of tokens, defaults to rate
+        (at least 1)
+    :keyword param clock: function returning the current time in seconds
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens and return the seconds to wait before using them.
+
+        The tokens are taken right away, so concurrent callers queue up
+        behind each other instead of all waking up at the same time.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping until they are available.
+
+        Return the seconds waited.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        """Hold back every caller for at least seconds, e.g. after a 429
+        response with a Retry-After header."""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RateLimiter(object):
+    """A TokenBucket per credential.
+
+    Clients given the same limiter share the budget of each username,
+    whether they are synchronous or asyncio clients.
+
+    :param rate: requests per second of each credential
+    :keyword param burst: requests which can be sent at once, defaults to
+        rate (at least 1)
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        """Return the TokenBucket of a credential."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, self._clock)
+            return bucket
+
+
+class RetryPolicy(object):
+    """When and how long to wait before sending a request again.
+
+    Throttled requests (429) are always retried, after the delay of their
+    Retry-After header when there is one. Other errors are only retried
+    for idempotent methods, or when the request couldn't be sent at all.
+    Without Retry-After the delay grows exponentially with full jitter.
+
+    :keyword param retries: maximum number of retries of a request
+    :keyword param backoff: base delay in seconds
+    :keyword param max_backoff: maximum delay in seconds, Retry-After
+        isn't capped
+    :keyword param statuses: response statuses which are retried
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, statuses=RETRY_STATUSES):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, method, attempt, status=None, retry_after=None, sent=True):
+        """Return the seconds to wait before retrying, or None when the
+        request must not be retried.
+
+        :param method: the HTTP method
+        :param attempt: number of retries made so far
+        :keyword param status: the response status, None after a network
+            error
+        :keyword param retry_after: seconds of the Retry-After header
+        :keyword param sent: False when the request never reached the
+            server, e.g. a connection failure
+        """
+        if attempt >= self.retries:
+            return None
+        if status is not None and status not in self.statuses:
+            return None
+        if sent and status != 429 and method not in IDEMPOTENT_METHODS:
+            return None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Return the seconds of a Retry-After header, either a number of
+    seconds or a HTTP date, None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    date = email.utils.parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+
+def rate_limiter(rate_limit):
+    """Return a RateLimiter from a number of requests per second."""
+    if rate_limit is None or isinstance(rate_limit, RateLimiter):
+        return rate_limit
+    return RateLimiter(rate_limit)
+
+
+def retry_policy(retry):
+    """Return a RetryPolicy from True, a number of retries or None."""
+    if retry is None or retry is False or isinstance(retry, RetryPolicy):
+        return retry or None
+    if retry is True:
+        return RetryPolicy()
+    return RetryPolicy(retries=retry)
@@ -0,0 +1,259 @@
+"""Conversion of record fields and the lazily converted record types."""
+import datetime
+from collections.abc import MutableMapping
+
+import iso8601
+
+from challonge import schema
+
+
+_NUMBER_START = frozenset("0123456789+-.")
+
+
+def convert(kind, v, tz):
+    """Convert the string v of a field of the given schema kind.
+
+    Fields of unknown kind (None) are converted if they look like a
+    datetime or a number. Strings which can't be converted are returned
+    unchanged.
+    """
+    if kind is None:
+        return guess_value(v, tz)
+    elif kind is schema.DATETIME:
+        return parse_datetime(v, tz)
+    elif kind is schema.FLOAT:
+        return parse_float(v)
+    return v
+
+
+def parse_datetime(v, tz):
+    # cheap shape check before parsing, ex. "2015-01-19T16:57:17-05:00"
+    if len(v) < 10 or v[4] != "-":
+        return v
+    # datetime.fromisoformat is much faster than iso8601 but doesn't
+    # accept every ISO 8601 string
+    try:
+        dt = datetime.datetime.fromisoformat(v)
+    except ValueError:
+        pass
+    else:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=iso8601.UTC)
+        return dt.astimezone(tz)
+    try:
+        return iso8601.parse_date(v).astimezone(tz)
+    except iso8601.ParseError:
+        return v
+
+
+def parse_float(v):
+    try:
+        return float(v)
+    except ValueError:
+        return v
+
+
+def guess_value(v, tz):
+    """Convert a string of an unknown field to datetime or float if it
+    looks like one."""
+    if v[:1] not in _NUMBER_START:
+        return v
+    if v[:4].isdigit():
+        try:
+            return iso8601.parse_date(v).astimezone(tz)
+        except iso8601.ParseError:
+            pass
+    return parse_float(v)
+
+
+class Record(MutableMapping):
+    """A parsed record which converts its fields on first access.
+
+    It keeps the decoded JSON object as is and converts datetime and
+    float strings only when they are read, the result is memoized. Apart
+    from not being a dict subclass it behaves like the dicts returned by
+    the eager parser, use ``dict(record)`` where a real dict is needed.
+    """
+    __slots__ = ("_data", "_fields", "_tz")
+
+    def __init__(self, data, fields, tz):
+        self._data = data
+        self._fields = fields
+        self._tz = tz
+
+    def __getitem__(self, key):
+        v = self._data[key]
+        if isinstance(v, str):
+            converted = convert(self._fields.get(key), v, self._tz)
+            if converted is not v:
+                self._data[key] = converted
+            return converted
+        return v
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, dict(self.items()))
+
+    def copy(self):
+        return self.__class__(dict(self._data), self._fields, self._tz)
+
+
+_MISSING = object()
+
+
+class TypedRecord(MutableMapping):
+    """Base class of the compact records of a known resource.
+
+    Every field of the resource's schema is stored in its own slot, so
+    records don't carry a dict each; fields missing from the schema are
+    kept in a small dict created on demand. Fields are readable both as
+    items (``match["state"]``) and as attributes (``match.state``), and
+    datetime and float fields are converted on first access like with
+    Record.
+    """
+    __slots__ = ("_tz", "_extra")
+
+    # set by _record_class()
+    resource = None
+    _slot_names = {}
+
+    def __init__(self, data, tz):
+        self._tz = tz
+        self._extra = None
+        slot_names = self._slot_names
+        for k, v in data.items():
+            slot = slot_names.get(k)
+            if slot is None:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[k] = v
+            else:
+                setattr(self, slot, v)
+
+    def __getitem__(self, key):
+        if key in self._slot_names:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        v = self._extra[key]
+        if isinstance(v, str):
+            converted = guess_value(v, self._tz)
+            if converted is not v:
+                self._extra[key] = converted
+            return converted
+        return v
+
+    def __setitem__(self, key, value):
+        slot = self._slot_names.get(key)
+        if slot is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            setattr(self, slot, value)
+
+    def __delitem__(self, key):
+        slot = self._slot_names.get(key)
+        try:
+            if slot is None:
+                if self._extra is None:
+                    raise KeyError(key)
+                del self._extra[key]
+            else:
+                delattr(self, slot)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key, slot in self._slot_names.items():
+            if getattr(self, slot, _MISSING) is not _MISSING:
+                yield key
+        if self._extra:
+            for key in list(self._extra):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        slot = self._slot_names.get(key)
+        if slot is None:
+            return bool(self._extra) and key in self._extra
+        return getattr(self, slot, _MISSING) is not _MISSING
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, dict(self.items()))
+
+    def copy(self):
+        record = self.__class__({}, self._tz)
+        for slot in self._slot_names.values():
+            v = getattr(self, slot, _MISSING)
+            if v is not _MISSING:
+                setattr(record, slot, v)
+        if self._extra:
+            record._extra = dict(self._extra)
+        return record
+
+
+def _field(key, slot, kind):
+    if kind is schema.DATETIME or kind is schema.FLOAT:
+        def get(self):
+            v = getattr(self, slot)
+            if isinstance(v, str):
+                converted = convert(kind, v, self._tz)
+                if converted is not v:
+                    setattr(self, slot, converted)
+                return converted
+            return v
+    else:
+        def get(self):
+            return getattr(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+
+    def delete(self):
+        delattr(self, slot)
+
+    return property(get, set, delete, "The %s field." % key)
+
+
+def _record_class(name, resource, doc):
+    kinds = schema.fields_of(resource)
+    slot_names = {k: "_" + k for k in kinds}
+    namespace = {
+        "__module__": __name__,
+        "__doc__": doc,
+        "__slots__": tuple(slot_names.values()),
+        "resource": resource,
+        "_slot_names": slot_names,
+    }
+    for k, slot in slot_names.items():
+        namespace[k] = _field(k, slot, kinds[k])
+    return type(name, (TypedRecord,), namespace)
+
+
+Tournament = _record_class("Tournament", "tournament", "A tournament record.")
+Match = _record_class("Match", "match", "A match record.")
+Participant = _record_class("Participant", "participant", "A participant record.")
+Attachment = _record_class("Attachment", "match_attachment", "A match attachment record.")
+
+# keyed by the name wrapping each record, ex. {"match": {...}}
+RECORD_CLASSES = {cls.resource: cls for cls in (Tournament, Match, Participant, Attachment)}
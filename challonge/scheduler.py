@@ -0,0 +1,209 @@
+"""Polling of many live tournaments with adaptive intervals."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from challonge import api
+from challonge.ratelimit import TokenBucket
+from challonge.sync import TournamentSync
+
+
+log = logging.getLogger(__name__)
+
+# states in which matches are being played
+ACTIVE_STATES = ("underway", "group_stages_underway", "checking_in")
+
+
+class _Job(object):
+
+    def __init__(self, tournament, sync, interval):
+        self.tournament = tournament
+        self.sync = sync
+        self.interval = interval
+        self.record = None
+        self.removed = False
+
+
+class PollScheduler(object):
+    """Polls tournaments.show() and the match (and participant) lists of
+    many tournaments from a pool of worker threads.
+
+    Each tournament has its own interval: it drops to min_interval as
+    soon as something changed and grows by the backoff factor on every
+    poll that found nothing new, up to active_interval while the
+    tournament is underway and up to max_interval otherwise. Tournaments
+    are dropped once they are complete.
+
+    All polls share a request budget, so the API sees at most ``budget``
+    requests per second however many tournaments are watched.
+
+        scheduler = PollScheduler(client, budget=5)
+        scheduler.add(tournament_id, on_change)
+        scheduler.start()
+        ...
+        scheduler.stop()
+
+    The callback is called from the worker threads as
+    callback(tournament, resource, delta), with the tournament's record
+    and a challonge.sync.Delta.
+
+    :keyword param client: the challonge.Challonge to use, defaults to
+        the client of the module level functions
+    :keyword param workers: number of worker threads
+    :keyword param budget: requests per second, or a
+        challonge.ratelimit.TokenBucket shared with other schedulers
+    :keyword param min_interval: seconds between polls of a tournament
+        which just changed
+    :keyword param active_interval: longest interval of an active
+        tournament
+    :keyword param max_interval: longest interval of an idle tournament
+    :keyword param backoff: factor applied to the interval when nothing
+        changed
+    :keyword param resources: the lists polled for each tournament
+    :keyword param on_error: called as on_error(tournament, exception)
+        when a poll fails, the tournament is polled again later
+    """
+
+    def __init__(self, client=None, workers=8, budget=None, min_interval=2,
+                 active_interval=15, max_interval=300, backoff=2,
+                 resources=("matches",), on_error=None):
+        self.client = client or api.get_default_client()
+        self.workers = workers
+        if budget is not None and not isinstance(budget, TokenBucket):
+            budget = TokenBucket(budget)
+        self.budget = budget
+        self.min_interval = min_interval
+        self.active_interval = active_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.resources = tuple(resources)
+        self.on_error = on_error
+        self._jobs = {}
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def add(self, tournament, callback):
+        """Start polling a tournament, right away."""
+        job = _Job(
+            tournament, TournamentSync(tournament, self.client, self.resources),
+            self.min_interval)
+        job.sync.subscribe(
+            lambda resource, delta: callback(job.record, resource, delta))
+        with self._condition:
+            self.remove(tournament)
+            self._jobs[tournament] = job
+            self._schedule(job, time.monotonic())
+
+    def remove(self, tournament):
+        """Stop polling a tournament."""
+        with self._condition:
+            job = self._jobs.pop(tournament, None)
+            if job is not None:
+                job.removed = True
+
+    def start(self):
+        """Run the scheduler in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="challonge-scheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler and wait for the running polls, the polls
+        not started yet are cancelled."""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self):
+        """Run the scheduler in the current thread until stop() is called."""
+        cost = 1 + len(self.resources)
+        pool = ThreadPoolExecutor(self.workers)
+        pending = set()
+        try:
+            while True:
+                job = self._next()
+                if job is None:
+                    return
+                if self.budget is not None:
+                    delay = self.budget.reserve(cost)
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                future = pool.submit(self._poll, job)
+                pending.add(future)
+                future.add_done_callback(pending.discard)
+        finally:
+            for future in list(pending):
+                future.cancel()
+            pool.shutdown()
+
+    def _next(self):
+        # wait for the next due job, None once stopped
+        with self._condition:
+            while not self._stop.is_set():
+                if self._queue:
+                    due, _, job = self._queue[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        if job.removed:
+                            continue
+                        return job
+                else:
+                    wait = None
+                self._condition.wait(wait)
+        return None
+
+    def _schedule(self, job, due):
+        with self._condition:
+            heapq.heappush(self._queue, (due, next(self._counter), job))
+            self._condition.notify()
+
+    def _poll(self, job):
+        changed = False
+        state = self._state(job)
+        try:
+            job.record = self.client.tournaments.show(job.tournament)
+            changed = any(job.sync.poll().values()) or state != self._state(job)
+        except Exception as e:
+            if self.on_error is not None:
+                try:
+                    self.on_error(job.tournament, e)
+                except Exception:
+                    # the job must be scheduled again all the same
+                    log.exception("on_error failed for tournament %s", job.tournament)
+
+        if job.removed:
+            return
+        if self._state(job) == "complete":
+            with self._condition:
+                if self._jobs.get(job.tournament) is job:
+                    self.remove(job.tournament)
+            return
+        job.interval = self._interval(job, changed)
+        self._schedule(job, time.monotonic() + job.interval)
+
+    @staticmethod
+    def _state(job):
+        return job.record.get("state") if job.record is not None else None
+
+    def _interval(self, job, changed):
+        if changed:
+            return self.min_interval
+        if self._state(job) in ACTIVE_STATES:
+            longest = self.active_interval
+        else:
+            longest = self.max_interval
+        return min(max(job.interval * self.backoff, self.min_interval), longest)
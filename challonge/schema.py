@@ -0,0 +1,142 @@
+"""Field types of the records returned by challonge.com.
+
+The parser uses these maps to convert known fields directly instead of
+guessing the type of every string. Fields missing from a map fall back
+to the guessing heuristic, so new API fields keep working.
+"""
+
+DATETIME = "datetime"
+FLOAT = "float"
+STRING = "string"
+# numbers, booleans, lists... which are used as they are
+VALUE = "value"
+
+
+def _values(*names):
+    return dict.fromkeys(names, VALUE)
+
+
+# fields which are always strings, whatever the resource
+COMMON = {
+    "name": STRING,
+    "display_name": STRING,
+    "display_name_with_invitation_email_address": STRING,
+    "username": STRING,
+    "challonge_username": STRING,
+    "created_at": DATETIME,
+    "updated_at": DATETIME,
+}
+
+TOURNAMENT = dict(COMMON, **_values(
+    "id", "participants_count", "progress_meter", "check_in_duration",
+    "signup_cap", "game_id", "event_id", "max_predictions_per_user",
+    "prediction_method", "swiss_rounds", "rr_iterations",
+    "group_stages_enabled", "group_stages_were_started",
+    "accept_attachments", "allow_participant_match_reporting",
+    "anonymous_voting", "created_by_api", "credit_capped", "hide_forum",
+    "hide_seeds", "hold_third_place_match",
+    "notify_users_when_matches_open", "notify_users_when_the_tournament_ends",
+    "open_signup", "private", "quick_advance", "require_score_agreement",
+    "sequential_pairings", "show_rounds", "teams", "tie_breaks",
+    "review_before_finalizing", "accepting_predictions",
+    "participants_locked", "participants_swappable", "team_convertable",
+    "public_predictions_before_start_time", "ranked",
+    "predict_the_losers_bracket", "spam", "ham", "tournament_registration_id",
+    "donation_contest_enabled", "mandatory_donation",
+    "non_elimination_tournament_data", "auto_assign_stations",
+    "only_start_matches_with_stations", "split_participants",
+    "allowed_regions", "show_participant_country", "program_id",
+    "program_classification_ids_allowed", "team_size_range", "toxic",
+    "use_new_style", "optional_display_data", "processing",
+    "oauth_application_id", "hide_bracket_preview",
+    "consolation_matches_target_rank", "participants", "matches"), **{
+    "started_at": DATETIME,
+    "completed_at": DATETIME,
+    "start_at": DATETIME,
+    "started_checking_in_at": DATETIME,
+    "predictions_opened_at": DATETIME,
+    "locked_at": DATETIME,
+    "pts_for_bye": FLOAT,
+    "pts_for_game_tie": FLOAT,
+    "pts_for_game_win": FLOAT,
+    "pts_for_match_tie": FLOAT,
+    "pts_for_match_win": FLOAT,
+    "rr_pts_for_game_tie": FLOAT,
+    "rr_pts_for_game_win": FLOAT,
+    "rr_pts_for_match_tie": FLOAT,
+    "rr_pts_for_match_win": FLOAT,
+    "registration_fee": FLOAT,
+    "url": STRING,
+    "subdomain": STRING,
+    "description": STRING,
+    "description_source": STRING,
+    "full_challonge_url": STRING,
+    "live_image_url": STRING,
+    "sign_up_url": STRING,
+    "state": STRING,
+    "tournament_type": STRING,
+    "ranked_by": STRING,
+    "game_name": STRING,
+    "category": STRING,
+    "grand_finals_modifier": STRING,
+    "registration_type": STRING,
+})
+
+MATCH = dict(COMMON, **_values(
+    "id", "tournament_id", "attachment_count", "group_id", "has_attachment",
+    "winner_id", "loser_id", "player1_id", "player2_id",
+    "player1_is_prereq_match_loser", "player2_is_prereq_match_loser",
+    "player1_prereq_match_id", "player2_prereq_match_id", "player1_votes",
+    "player2_votes", "round", "suggested_play_order", "forfeited",
+    "optional", "open_graph_image_file_size"), **{
+    "started_at": DATETIME,
+    "completed_at": DATETIME,
+    "underway_at": DATETIME,
+    "scheduled_time": DATETIME,
+    "state": STRING,
+    "identifier": STRING,
+    "location": STRING,
+    "scores_csv": STRING,
+    "prerequisite_match_ids_csv": STRING,
+    "open_graph_image_file_name": STRING,
+    "open_graph_image_content_type": STRING,
+})
+
+PARTICIPANT = dict(COMMON, **_values(
+    "id", "tournament_id", "active", "final_rank", "group_id",
+    "invitation_id", "on_waiting_list", "seed",
+    "challonge_email_address_verified", "removable",
+    "participatable_or_invitation_attached", "confirm_remove",
+    "invitation_pending", "can_check_in", "checked_in", "reactivatable",
+    "group_player_ids", "check_in_open", "ranked_member_id",
+    "custom_field_response", "clinch", "integration_uids"), **{
+    "checked_in_at": DATETIME,
+    "misc": STRING,
+    "icon": STRING,
+    "invite_email": STRING,
+    "email_hash": STRING,
+    "attached_participatable_portrait_url": STRING,
+})
+
+ATTACHMENT = dict(COMMON, **_values(
+    "id", "match_id", "user_id", "asset_file_size"), **{
+    "description": STRING,
+    "url": STRING,
+    "original_file_name": STRING,
+    "asset_file_name": STRING,
+    "asset_content_type": STRING,
+    "asset_url": STRING,
+})
+
+# keyed by the name wrapping each record, ex. {"match": {...}}
+RESOURCES = {
+    "tournament": TOURNAMENT,
+    "match": MATCH,
+    "participant": PARTICIPANT,
+    "match_attachment": ATTACHMENT,
+}
+
+
+def fields_of(resource):
+    """Return the field map of a resource, unknown resources get COMMON."""
+    return RESOURCES.get(resource, COMMON)
@@ -0,0 +1,91 @@
+"""Deduplication of identical concurrent calls."""
+import asyncio
+import threading
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Share the work of identical concurrent calls between threads.
+
+    While a call for a key is running, other threads calling do() with
+    the same key wait for it and get its result (or its exception)
+    instead of running the function themselves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), shared with concurrent callers of key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(object):
+    """Share the work of identical concurrent coroutines in an event loop.
+
+    The asyncio counterpart of SingleFlight. The shared call runs in its
+    own task: a caller being cancelled, the first one included, doesn't
+    cancel it for the others; it is cancelled when all its callers are.
+    """
+
+    def __init__(self):
+        # key -> [task, number of callers waiting for it]
+        self._calls = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        """Return await func(*args, **kwargs), shared with concurrent callers of key."""
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda task: self._done(key, task))
+        call[1] += 1
+        try:
+            return await asyncio.shield(call[0])
+        except asyncio.CancelledError:
+            if call[1] == 1 and not call[0].done():
+                # no one else waits for it, new callers start another call
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call[0].cancel()
+            raise
+        finally:
+            call[1] -= 1
+
+    def _done(self, key, task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # the callers, if any, get the exception, don't warn about it
+            task.exception()
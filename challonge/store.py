@@ -0,0 +1,192 @@
+"""A persistent on-disk store of finalized tournaments."""
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS finalized (
+    ident TEXT PRIMARY KEY,
+    tournament_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    uri TEXT NOT NULL,
+    params TEXT NOT NULL,
+    tournament_id TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (uri, params)
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE INDEX IF NOT EXISTS responses_tournament ON responses (tournament_id);
+"""
+
+
+class TournamentStore(object):
+    """Keeps the GET responses of complete tournaments in a SQLite file.
+
+    Once a client sees a tournament in the 'complete' state, in the
+    response of tournaments.show() or tournaments.index(), the GET
+    responses of that tournament (show, matches, participants,
+    attachments...) are saved and later read from disk instead of the
+    API. Writes made through the client to a stored tournament drop it
+    from the store.
+
+    The least recently used responses are removed when the store holds
+    more than max_bytes of response bodies or more than max_entries
+    responses.
+
+    :param path: the SQLite database file, ':memory:' for a temporary
+        store
+    :keyword param max_bytes: maximum total size of the stored bodies
+    :keyword param max_entries: maximum number of stored responses
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, max_entries=100000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+            # running totals of the responses table, so inserts don't
+            # have to sum it
+            self._size, self._count = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses").fetchone()
+
+    def close(self):
+        """Close the database file."""
+        with self._lock:
+            self._db.close()
+
+    def get(self, key):
+        """Return the stored body of a GET request key, or None."""
+        params = _dump_params(key[1])
+        with self._lock, self._db:
+            uri = self._canonical_uri(key[0])
+            if uri is None:
+                return None
+            row = self._db.execute(
+                "SELECT body FROM responses WHERE uri = ? AND params = ?",
+                (uri, params)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE uri = ? AND params = ?",
+                (time.time(), uri, params))
+        return bytes(row[0])
+
+    def observe(self, key, body, result):
+        """Look at a GET response fetched from the API.
+
+        Learn which tournaments are complete from it and save it if it
+        belongs to one of them.
+        """
+        uri = key[0]
+        parts = uri.split("/")
+        if len(parts) == 1:
+            # the tournaments index
+            for t in result:
+                if t.get("state") == "complete":
+                    self._finalize(t)
+            return
+
+        if len(parts) == 2 and isinstance(result, Mapping) and result.get("state") == "complete":
+            self._finalize(result, parts[1])
+
+        with self._lock, self._db:
+            uri = self._canonical_uri(uri)
+            if uri is None:
+                return
+            params = _dump_params(key[1])
+            row = self._db.execute(
+                "SELECT size FROM responses WHERE uri = ? AND params = ?",
+                (uri, params)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (uri, params, uri.split("/")[1], sqlite3.Binary(body),
+                 len(body), time.time()))
+            if row is None:
+                self._count += 1
+            else:
+                self._size -= row[0]
+            self._size += len(body)
+            if self._size > self.max_bytes or self._count > self.max_entries:
+                self._evict()
+
+    def invalidate(self, uri):
+        """Forget the tournament of uri, after a write to it."""
+        parts = uri.split("/")
+        if len(parts) == 1:
+            return
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT tournament_id FROM finalized WHERE ident = ?",
+                (parts[1],)).fetchone()
+            if row is None:
+                return
+            size, count = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses"
+                " WHERE tournament_id = ?", row).fetchone()
+            self._db.execute("DELETE FROM finalized WHERE tournament_id = ?", row)
+            self._db.execute("DELETE FROM responses WHERE tournament_id = ?", row)
+            self._size -= size
+            self._count -= count
+
+    def clear(self):
+        """Remove everything from the store."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM finalized")
+            self._db.execute("DELETE FROM responses")
+            self._size = self._count = 0
+
+    def _canonical_uri(self, uri):
+        # the uri with the tournament's id instead of the url it may be
+        # referenced with, None when the tournament isn't stored
+        parts = uri.split("/")
+        if len(parts) == 1:
+            return None
+        row = self._db.execute(
+            "SELECT tournament_id FROM finalized WHERE ident = ?",
+            (parts[1],)).fetchone()
+        if row is None:
+            return None
+        parts[1] = row[0]
+        return "/".join(parts)
+
+    def _finalize(self, tournament, ident=None):
+        # a tournament can be referenced by id, url or subdomain-url
+        tournament_id = str(tournament["id"])
+        idents = {tournament_id, tournament.get("url")}
+        if tournament.get("subdomain") and tournament.get("url"):
+            idents.add("%s-%s" % (tournament["subdomain"], tournament["url"]))
+        if ident is not None:
+            idents.add(ident)
+        idents.discard(None)
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO finalized VALUES (?, ?)",
+                [(i, tournament_id) for i in idents])
+
+    def _evict(self):
+        size, count = self._size, self._count
+        stale = []
+        rows = self._db.execute(
+            "SELECT uri, params, size FROM responses ORDER BY accessed")
+        for uri, params, row_size in rows:
+            if size <= self.max_bytes and count <= self.max_entries:
+                break
+            stale.append((uri, params))
+            size -= row_size
+            count -= 1
+        self._db.executemany(
+            "DELETE FROM responses WHERE uri = ? AND params = ?", stale)
+        self._size, self._count = size, count
+
+
+def _dump_params(params):
+    return json.dumps(params, sort_keys=True, default=str)
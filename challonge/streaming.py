@@ -0,0 +1,83 @@
+"""Incremental splitting of JSON list responses."""
+import re
+
+
+# bytes read from the network at once
+CHUNK_SIZE = 64 * 1024
+
+# the characters which change the nesting of a JSON document
+_TOKENS = re.compile(br'[\\"{}\[\]]')
+_BACKSLASH, _QUOTE = ord("\\"), ord('"')
+_OPENING = (ord("{"), ord("["))
+
+
+class ArraySplitter(object):
+    """Splits a JSON array of objects, fed in chunks, into the bytes of
+    each object.
+
+    Only the object being read is kept in memory, so the memory used
+    depends on the size of the largest object and not on the length of
+    the array.
+
+        splitter = ArraySplitter()
+        for chunk in chunks:
+            for element in splitter.feed(chunk):
+                record = json.loads(element)
+
+    Elements of the array which aren't objects or arrays are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self._depth = 0
+        self._in_string = False
+        self._start = 0
+        # offset of a character escaped by a backslash
+        self._escaped = -1
+
+    def feed(self, chunk):
+        """Return the list of elements completed by chunk."""
+        offset = len(self._buffer)
+        buffer = self._buffer = self._buffer + chunk
+        elements = []
+        for match in _TOKENS.finditer(buffer, offset):
+            i = match.start()
+            if i == self._escaped:
+                continue
+            c = buffer[i]
+            if self._in_string:
+                if c == _BACKSLASH:
+                    self._escaped = i + 1
+                elif c == _QUOTE:
+                    self._in_string = False
+            elif c == _QUOTE:
+                self._in_string = True
+            elif c in _OPENING:
+                self._depth += 1
+                if self._depth == 2:
+                    self._start = i
+            else:
+                if self._depth == 2:
+                    elements.append(buffer[self._start:i + 1])
+                self._depth -= 1
+
+        # drop what was read, except the beginning of the current element
+        keep = self._start if self._depth >= 2 else len(buffer)
+        self._buffer = buffer[keep:]
+        self._start -= keep
+        self._escaped -= keep
+        return elements
+
+    def close(self):
+        """Check the array was complete."""
+        if self._depth or self._in_string:
+            raise ValueError("Truncated JSON array")
+
+
+def iter_array(chunks):
+    """Yield the bytes of each object of a JSON array read from chunks."""
+    splitter = ArraySplitter()
+    for chunk in chunks:
+        for element in splitter.feed(chunk):
+            yield element
+    splitter.close()
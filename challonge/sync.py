@@ -0,0 +1,148 @@
+"""Incremental synchronization of a tournament's matches and participants."""
+import time
+from collections import namedtuple
+
+from challonge import api
+
+
+class Delta(namedtuple("Delta", ["inserted", "changed", "removed"])):
+    """What changed in a resource list since the previous poll.
+
+    ``inserted`` and ``changed`` hold the new records, ``removed`` the
+    last known version of the records which disappeared.
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(self.inserted or self.changed or self.removed)
+
+
+EMPTY = Delta((), (), ())
+
+
+class TournamentSync(object):
+    """Keeps a local snapshot of a tournament's matches and participants.
+
+    Each poll() fetches the lists with matches.index() and
+    participants.index() and compares them to the snapshot by id and
+    ``updated_at``, so only what changed is handed to the callbacks.
+    A client created with ``conditional=True`` makes polls of unchanged
+    lists almost free.
+
+        sync = TournamentSync(tournament_id)
+        sync.subscribe(lambda resource, delta: print(resource, delta))
+        sync.poll()
+
+    :param tournament: the tournament's name or id
+    :keyword param client: the challonge.Challonge to use, defaults to
+        the client of the module level functions
+    :keyword param resources: the lists to synchronize
+    """
+
+    def __init__(self, tournament, client=None, resources=("matches", "participants")):
+        self.tournament = tournament
+        self.client = client or api.get_default_client()
+        self.resources = tuple(resources)
+        self.snapshots = {resource: {} for resource in self.resources}
+        self._results = {}
+        self._callbacks = []
+
+    def subscribe(self, callback):
+        """Call callback(resource, delta) for every non empty delta."""
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        self._callbacks.remove(callback)
+
+    def poll(self):
+        """Fetch the lists and return a Delta for each resource.
+
+        Every callback is called even if another one raises. The snapshot
+        of a resource is only updated once all its callbacks succeeded,
+        so a delta a callback failed on is reported again by the next
+        poll; the first exception is raised after all callbacks ran.
+        """
+        deltas = {}
+        updates = {}
+        for resource in self.resources:
+            records = getattr(self.client, resource).index(self.tournament)
+            deltas[resource], updates[resource] = self._diff(resource, records)
+
+        error = None
+        for resource, delta in deltas.items():
+            failed = False
+            if delta:
+                for callback in list(self._callbacks):
+                    try:
+                        callback(resource, delta)
+                    except Exception as e:
+                        failed = True
+                        if error is None:
+                            error = e
+            if not failed:
+                self._update(resource, *updates[resource])
+        if error is not None:
+            raise error
+        return deltas
+
+    def apply(self, resource, records):
+        """Update the snapshot of resource with a fetched list and return
+        the Delta."""
+        delta, update = self._diff(resource, records)
+        self._update(resource, *update)
+        return delta
+
+    def _diff(self, resource, records):
+        # return the Delta of records and what _update() needs to make
+        # them the snapshot
+        if records is self._results.get(resource):
+            # the client returned the previous result, nothing changed
+            return EMPTY, (None, None)
+
+        previous = self.snapshots[resource]
+        current = {}
+        inserted = []
+        changed = []
+        for record in records:
+            record_id = record["id"]
+            current[record_id] = record
+            old = previous.get(record_id)
+            if old is None:
+                inserted.append(record)
+            elif _changed(old, record):
+                changed.append(record)
+        removed = [record for record_id, record in previous.items() if record_id not in current]
+
+        if not (inserted or changed or removed):
+            return EMPTY, (records, current)
+        return Delta(inserted, changed, removed), (records, current)
+
+    def _update(self, resource, records, snapshot):
+        if snapshot is not None:
+            self._results[resource] = records
+            self.snapshots[resource] = snapshot
+
+    def watch(self, interval=5, stop=None):
+        """Poll every interval seconds and yield (resource, delta) pairs
+        for every change.
+
+        :keyword param stop: a threading.Event ending the generator when
+            set
+        """
+        while stop is None or not stop.is_set():
+            started = time.monotonic()
+            for resource, delta in self.poll().items():
+                if delta:
+                    yield resource, delta
+            wait = max(0, interval - (time.monotonic() - started))
+            if stop is None:
+                time.sleep(wait)
+            else:
+                stop.wait(wait)
+
+
+def _changed(old, new):
+    old_updated_at = old.get("updated_at")
+    if old_updated_at is not None:
+        return old_updated_at != new.get("updated_at")
+    return old != new
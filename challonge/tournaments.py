@@ -1,11 +1,76 @@
-from challonge import api
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 
+from challonge import api, tracing
 
+
+# no tournament was created on challonge.com before this day
+FIRST_DAY = datetime.date(2009, 1, 1)
+
+_DAY = datetime.timedelta(days=1)
+
+
+@tracing.traced
 def index(**params):
     """Retrieve a set of tournaments created with your account."""
     return api.fetch_and_parse("GET", "tournaments", **params)
 
 
+@tracing.traced
+def iter_index(created_after=None, created_before=None, window=30, prefetch=False, **params):
+    """Iterate over the tournaments created with your account, newest first.
+
+    Instead of a single huge response the tournaments are fetched by
+    windows of creation dates, going back from created_before to
+    created_after. The window doubles after every empty one, so quiet
+    periods only take a few requests, and is back to its first size after
+    a window with tournaments.
+
+    :keyword param created_after: date of the oldest tournaments, defaults
+        to FIRST_DAY
+    :keyword param created_before: date of the newest tournaments,
+        defaults to today
+    :keyword param window: days of the first window
+    :keyword param prefetch: fetch the next window in a background thread
+        while the current one is consumed
+    :keyword param params: other filters of index(), e.g. state
+
+    """
+    start = _as_date(created_after) or FIRST_DAY
+    hi = _as_date(created_before) or datetime.date.today()
+    span = datetime.timedelta(days=window)
+    lo = max(start, hi - span + _DAY)
+
+    def get(lo, hi):
+        # the API's date filters may exclude their bounds, so ask for a
+        # day more on each side and drop the tournaments already seen
+        return index(created_after=lo - _DAY, created_before=hi + _DAY, **params)
+
+    pool = ThreadPoolExecutor(1) if prefetch else None
+    future = pool.submit(tracing.run_in_context(get), lo, hi) if pool is not None else None
+    seen = set()
+    try:
+        while hi >= start:
+            page = future.result() if pool is not None else get(lo, hi)
+            if not page:
+                span *= 2
+            else:
+                span = datetime.timedelta(days=window)
+            hi = lo - _DAY
+            lo = max(start, hi - span + _DAY)
+            if pool is not None and hi >= start:
+                future = pool.submit(tracing.run_in_context(get), lo, hi)
+
+            for t in page:
+                if t["id"] not in seen:
+                    seen.add(t["id"])
+                    yield t
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+@tracing.traced
 def create(name, url, tournament_type="single elimination", **params):
     """Create a new tournament."""
     params.update({
@@ -17,16 +82,19 @@ def create(name, url, tournament_type="single elimination", **params):
     return api.fetch_and_parse("POST", "tournaments", "tournament", **params)
 
 
+@tracing.traced
 def show(tournament, **params):
     """Retrieve a single tournament record created with your account."""
     return api.fetch_and_parse("GET", "tournaments/%s" % tournament, **params)
 
 
+@tracing.traced
 def update(tournament, **params):
     """Update a tournament's attributes."""
     api.fetch("PUT", "tournaments/%s" % tournament, "tournament", **params)
 
 
+@tracing.traced
 def destroy(tournament):
     """Deletes a tournament along with all its associated records.
 
@@ -36,6 +104,7 @@ def destroy(tournament):
     api.fetch("DELETE", "tournaments/%s" % tournament)
 
 
+@tracing.traced
 def process_check_ins(tournament, **params):
     """This should be invoked after a tournament's
     check-in window closes before the tournament is started.
@@ -51,6 +120,7 @@ def process_check_ins(tournament, **params):
         **params)
 
 
+@tracing.traced
 def abort_check_in(tournament, **params):
     """When your tournament is in a 'checking_in' or 'checked_in' state,
     there's no way to edit the tournament's start time (start_at)
@@ -67,6 +137,7 @@ def abort_check_in(tournament, **params):
         **params)
 
 
+@tracing.traced
 def open_for_predictions(tournament, **params):
     """Open predictions for a tournament
 
@@ -80,6 +151,7 @@ def open_for_predictions(tournament, **params):
         **params)
 
 
+@tracing.traced
 def start(tournament, **params):
     """Start a tournament, opening up matches for score reporting.
 
@@ -92,6 +164,7 @@ def start(tournament, **params):
         **params)
 
 
+@tracing.traced
 def finalize(tournament, **params):
     """Finalize a tournament that has had all match scores submitted,
     rendering its results permanent.
@@ -103,6 +176,7 @@ def finalize(tournament, **params):
         **params)
 
 
+@tracing.traced
 def reset(tournament, **params):
     """Reset a tournament, clearing all of its scores and attachments.
 
@@ -114,3 +188,11 @@ def reset(tournament, **params):
         "POST",
         "tournaments/%s/reset" % tournament,
         **params)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
@@ -0,0 +1,289 @@
+"""Optional tracing spans around API calls.
+
+With an exporter set, every call of a resource function (e.g.
+matches.update) and every HTTP request is recorded as a span. Spans
+started while another one is running are its children, in the same
+thread, in the threads of the ``*_many`` batch functions and in asyncio
+tasks, so the requests made on behalf of one user action can be told
+apart::
+
+    exporter = challonge.tracing.InMemoryExporter()
+    challonge.tracing.set_exporter(exporter)
+
+    with challonge.tracing.span("report result"):
+        client.matches.update(t_id, m_id, winner_id=p_id, scores_csv="2-1")
+        client.matches.index(t_id, state="open")
+
+    for s in exporter.spans:
+        print(s.name, s.parent_id, s.duration)
+
+Any object with an ``export(span)`` method can be an exporter, e.g. one
+forwarding the spans to OpenTelemetry. Without an exporter, the default,
+no span is created.
+"""
+import contextvars
+import functools
+import inspect
+import random
+import threading
+import time
+
+from challonge.hooks import uri_template
+
+
+_exporter = None
+_current = contextvars.ContextVar("challonge_span", default=None)
+
+
+class Span(object):
+    """A timed operation, part of a trace.
+
+    Ids are hexadecimal strings, the parent_id of a root span is None.
+    Times are seconds since the epoch. ``error`` is the exception the
+    operation raised, if any.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end",
+                 "attributes", "events", "error", "_exporter", "_token")
+
+    def __init__(self, name, parent=None, attributes=None, exporter=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else "%032x" % random.getrandbits(128)
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.end = None
+        self.attributes = attributes or {}
+        self.events = []
+        self.error = None
+        self._exporter = exporter
+        self._token = None
+
+    def __repr__(self):
+        return "<Span %s %s>" % (self.name, self.span_id)
+
+    def __bool__(self):
+        return True
+
+    @property
+    def duration(self):
+        """Seconds the operation took, None while it runs."""
+        return self.end - self.start if self.end is not None else None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, **attributes):
+        """Record something that happened during the operation."""
+        self.events.append((name, time.time(), attributes))
+
+    def finish(self, error=None):
+        """End the span and export it."""
+        if error is not None:
+            self.error = error
+        self.end = time.time()
+        if self._exporter is not None:
+            self._exporter.export(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.finish(exc)
+
+
+class _NoopSpan(object):
+    """The span returned while tracing is disabled, it does nothing."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryExporter(object):
+    """Keeps the finished spans in a list, for tests."""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def named(self, name):
+        """Return the finished spans called name."""
+        with self._lock:
+            return [s for s in self.spans if s.name == name]
+
+    def children(self, span):
+        """Return the finished spans whose parent is span."""
+        with self._lock:
+            return [s for s in self.spans if s.parent_id == span.span_id]
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+
+def set_exporter(exporter=None):
+    """Record spans and give them to exporter.export() as they finish,
+    None disables tracing."""
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter():
+    return _exporter
+
+
+def current_span():
+    """Return the span running in this thread or task, a span doing
+    nothing if there is none."""
+    return _current.get() or NOOP_SPAN
+
+
+def span(name, **attributes):
+    """Return a new span, child of the current one, to be used as a
+    context manager; it does nothing while tracing is disabled."""
+    exporter = _exporter
+    if exporter is None:
+        return NOOP_SPAN
+    return Span(name, _current.get() or None, attributes, exporter)
+
+
+def request_span(method, uri):
+    """Return the span of an HTTP request."""
+    if _exporter is None:
+        return NOOP_SPAN
+    return span("challonge.request", **{
+        "http.method": method,
+        "http.route": uri_template(uri),
+        "challonge.uri": uri,
+    })
+
+
+def traced(func):
+    """Decorate a resource function to run it in a span named after it,
+    e.g. "challonge.matches.update".
+
+    The span of a function returning an iterator, plain or asynchronous,
+    covers its iteration. The undecorated function is ``__wrapped__``.
+    """
+    name = "%s.%s" % (func.__module__, func.__name__)
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return func(*args, **kwargs)
+            return _traced_async_iterator(span(name), func(*args, **kwargs))
+
+    elif inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return await func(*args, **kwargs)
+            with span(name):
+                return await func(*args, **kwargs)
+
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return func(*args, **kwargs)
+            s = span(name)
+            token = _current.set(s)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                s.finish(e)
+                raise
+            finally:
+                _current.reset(token)
+            if inspect.isgenerator(result):
+                # e.g. matches.iter_index, the requests are made while
+                # iterating
+                return _traced_iterator(s, result)
+            s.finish()
+            return result
+
+    return wrapper
+
+
+def _traced_iterator(s, iterator):
+    # the span is current only while the iterator runs, not while the
+    # caller handles the items
+    error = None
+    try:
+        while True:
+            token = _current.set(s)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield item
+    except GeneratorExit:
+        # the caller stopped iterating, not an error
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        iterator.close()
+        s.finish(error)
+
+
+async def _traced_async_iterator(s, iterator):
+    error = None
+    try:
+        while True:
+            token = _current.set(s)
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        await iterator.aclose()
+        s.finish(error)
+
+
+def run_in_context(func):
+    """Return a function calling func in a copy of the current context,
+    so spans started by func in another thread are children of the
+    current span."""
+    if _exporter is None:
+        return func
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func)
@@ -22,17 +22,24 @@ setup(name = "pychal",
         'Intended Audience :: Developers',
         'License :: Public Domain',
         'Operating System :: OS Independent',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6'
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
+        'Programming Language :: Python :: 3.13'
     ],
+    python_requires = '>=3.8',
     install_requires = [
         'iso8601==0.1.12',
         'tzlocal==2.0.0',
         'pytz==2019.3',
         'requests==2.32.2',
     ],
+    extras_require = {
+        'aio': ['aiohttp>=3.7'],
+        'fast': ['orjson'],
+    },
 )
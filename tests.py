@@ -1,11 +1,19 @@
+import asyncio
 import datetime
+import threading
+import time
+import pytz
 import tzlocal
 import os
 import random
+import shutil
 import string
+import tempfile
 import requests
 import unittest
 import challonge
+import challonge.emulator
+import challonge.store
 
 
 username = None
@@ -16,6 +24,48 @@ def _get_random_name():
     return "pychal_" + "".join(random.choice(string.ascii_lowercase) for _ in range(0, 15))
 
 
+class FakeResponse(requests.Response):
+
+    def __init__(self, content, status_code=200, headers=None):
+        super(FakeResponse, self).__init__()
+        self._content = content
+        self._content_consumed = True
+        self.status_code = status_code
+        self.headers.update(headers or {})
+
+
+class FakeSession(object):
+    """Stands in for requests.Session, returning queued responses."""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+
+    def respond(self, content, status_code=200, headers=None):
+        self.responses.append(FakeResponse(content, status_code, headers))
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        response = self.responses.pop(0)
+        response.url = url
+        return response
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    """A transport adapter answering every request with content."""
+
+    content = b"{}"
+
+    def send(self, request, **kwargs):
+        response = FakeResponse(self.content, headers={"Content-Type": "application/json"})
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
 class APITestCase(unittest.TestCase):
 
     def test_set_credentials(self):
@@ -35,15 +85,1195 @@ class APITestCase(unittest.TestCase):
 
     def test_set_get_timezone(self):
         test_tz = 'Asia/Seoul'
+        self.addCleanup(challonge.set_timezone, str(challonge.get_timezone()))
         challonge.set_timezone(test_tz)
         tz = challonge.get_timezone()
         self.assertEqual(str(tz), test_tz)
 
+    def test_session_is_reused(self):
+        session = challonge.api.get_session()
+        self.assertIs(challonge.api.get_session(), session)
+
+        challonge.configure_session(pool_maxsize=4, timeout=10)
+        self.assertIsNot(challonge.api.get_session(), session)
+        self.assertEqual(challonge.api._session_options["timeout"], 10)
+
+        session = challonge.api.get_session()
+        challonge.close_session()
+        self.assertIsNot(challonge.api.get_session(), session)
+        challonge.configure_session(
+            pool_maxsize=10, timeout=challonge.api.DEFAULT_TIMEOUT)
+
+    def test_configure_session_unknown_option(self):
+        self.assertRaises(TypeError, challonge.configure_session, pool_size=4)
+
     def test_call(self):
         challonge.set_credentials(username, api_key)
         self.assertNotEqual(challonge.fetch("GET", "tournaments"), '')
 
 
+class ParseTestCase(unittest.TestCase):
+
+    def test_parse_known_fields(self):
+        tz = pytz.timezone("America/New_York")
+        m = challonge.api._parse({"match": {
+            "id": 1,
+            "created_at": "2015-01-19T16:57:17.123-05:00",
+            "underway_at": None,
+            "scores_csv": "3",
+            "identifier": "2020-01",
+            "state": "open"}}, tz)
+
+        self.assertEqual(
+            m["created_at"],
+            datetime.datetime(2015, 1, 19, 21, 57, 17, 123000, tzinfo=datetime.timezone.utc))
+        self.assertEqual(m["created_at"].tzinfo.zone, tz.zone)
+        self.assertEqual(m["created_at"].utcoffset(), datetime.timedelta(hours=-5))
+        self.assertIsNone(m["underway_at"])
+        self.assertEqual(m["scores_csv"], "3")
+        self.assertEqual(m["identifier"], "2020-01")
+
+    def test_parse_unknown_fields(self):
+        t = challonge.api._parse({"tournament": {
+            "pts_for_match_win": "1.0",
+            "some_new_date": "2015-01-19T16:57:17-05:00",
+            "some_new_number": "0.5",
+            "some_new_text": "text"}})
+
+        self.assertEqual(t["pts_for_match_win"], 1.0)
+        self.assertIsInstance(t["some_new_date"], datetime.datetime)
+        self.assertEqual(t["some_new_number"], 0.5)
+        self.assertEqual(t["some_new_text"], "text")
+
+    def test_parse_lazy(self):
+        data = {"match": {
+            "id": 1,
+            "created_at": "2015-01-19T16:57:17-05:00",
+            "scores_csv": "3-1",
+            "some_new_number": "0.5"}}
+        eager = challonge.api._parse({"match": dict(data["match"])})
+        lazy = challonge.api._parse(data, lazy=True)
+
+        self.assertIsInstance(lazy, challonge.records.Match)
+        self.assertEqual(data["match"]["created_at"], "2015-01-19T16:57:17-05:00")
+        self.assertEqual(lazy["created_at"], eager["created_at"])
+        self.assertIs(lazy["created_at"], lazy["created_at"])
+        self.assertEqual(lazy, eager)
+        self.assertEqual(dict(lazy), eager)
+        self.assertEqual(lazy.pop("some_new_number"), 0.5)
+        self.assertNotIn("some_new_number", lazy)
+
+    def test_typed_records(self):
+        m = challonge.api._parse({"match": {
+            "id": 1,
+            "state": "open",
+            "underway_at": "2015-01-19T16:57:17-05:00"}}, lazy=True)
+
+        self.assertEqual(m.state, "open")
+        self.assertIs(m.underway_at, m["underway_at"])
+        self.assertIsInstance(m.underway_at, datetime.datetime)
+        self.assertFalse(hasattr(m, "__dict__"))
+
+        m["winner_id"] = 2
+        self.assertEqual(m.winner_id, 2)
+        self.assertEqual(len(m), 4)
+        self.assertEqual(m.copy(), m)
+
+        del m["state"]
+        self.assertNotIn("state", m)
+        self.assertRaises(KeyError, m.__getitem__, "state")
+
+        r = challonge.api._parse({"group": {"id": 1}}, lazy=True)
+        self.assertIsInstance(r, challonge.records.Record)
+
+    def test_json_backend(self):
+        import json
+        self.assertIs(challonge.api.get_json_loads("json"), json.loads)
+        self.assertIsNotNone(challonge.api.get_json_loads())
+        self.assertRaises(ValueError, challonge.api.get_json_loads, "yaml")
+
+        client = challonge.Challonge(json_backend="json")
+        self.assertEqual(client._json_loads(b'[{"match": {"id": 1}}]'), [{"match": {"id": 1}}])
+
+    def test_parse_empty(self):
+        self.assertEqual(challonge.api._parse([]), [])
+
+
+class StreamingTestCase(unittest.TestCase):
+
+    def test_split(self):
+        body = b'[{"match": {"id": 1, "name": "a\\"}"}}, {"match": {"id": 2, "ids": [1, {}]}}]'
+        chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+
+        elements = list(challonge.streaming.iter_array(chunks))
+        self.assertEqual(elements, [
+            b'{"match": {"id": 1, "name": "a\\"}"}}',
+            b'{"match": {"id": 2, "ids": [1, {}]}}'])
+        self.assertRaises(ValueError, list, challonge.streaming.iter_array([body[:-5]]))
+
+    def test_iter_index(self):
+        session = FakeSession()
+        client = challonge.Challonge(timezone="UTC", lazy=True)
+        client.get_session = lambda: session
+        session.respond(b'[{"match": {"id": 1, "state": "open"}}, {"match": {"id": 2}}]')
+
+        matches = client.matches.iter_index(1, state="open")
+        self.assertEqual(next(matches).state, "open")
+        self.assertEqual([m.id for m in matches], [2])
+        self.assertTrue(session.requests[0][2]["stream"])
+
+
+class BracketTestCase(unittest.TestCase):
+
+    TOURNAMENT = (
+        b'{"tournament": {"id": 1, "state": "underway", "participants": ['
+        b'{"participant": {"id": 10, "seed": 1, "group_player_ids": [100]}},'
+        b'{"participant": {"id": 11, "seed": 2, "group_player_ids": [101]}},'
+        b'{"participant": {"id": 12, "seed": 3, "group_player_ids": []}}], "matches": ['
+        b'{"match": {"id": 20, "identifier": "A", "round": 1, "group_id": 5,'
+        b' "player1_id": 100, "player2_id": 101, "state": "complete"}},'
+        b'{"match": {"id": 21, "identifier": "A", "round": 1, "player1_id": 10,'
+        b' "player2_id": 12, "updated_at": "2020-01-01T00:00:00Z"}},'
+        b'{"match": {"id": 22, "identifier": "B", "round": 2, "player1_id": 11,'
+        b' "player2_id": null}}]}}')
+
+    def load(self, lazy=False):
+        session = FakeSession()
+        client = challonge.Challonge(timezone="UTC", lazy=lazy)
+        client.get_session = lambda: session
+        session.respond(self.TOURNAMENT)
+        bracket = challonge.bracket.load(1, client)
+        self.assertEqual(session.requests[0][2]["params"], [
+            ("include_participants", 1), ("include_matches", 1)])
+        return bracket
+
+    def test_indexes(self):
+        bracket = self.load()
+
+        self.assertEqual(bracket.tournament["state"], "underway")
+        self.assertEqual(bracket.participants_by_seed[2]["id"], 11)
+        self.assertEqual(bracket.participant(100)["id"], 10)
+        self.assertEqual(bracket.match("A")["id"], 21)
+        self.assertEqual(bracket.match("A", group_id=5)["id"], 20)
+        self.assertEqual([m["id"] for m in bracket.matches_by_round[1]], [20, 21])
+        self.assertEqual([m["id"] for m in bracket.matches_of(10)], [20, 21])
+        self.assertEqual([m["id"] for m in bracket.matches_of(101)], [20, 22])
+        self.assertEqual(bracket.matches_of(42), [])
+        self.assertIsInstance(bracket.matches_by_id[21]["updated_at"], datetime.datetime)
+
+    def test_lazy(self):
+        bracket = self.load(lazy=True)
+        self.assertIsInstance(bracket.participants[0], challonge.records.Participant)
+        self.assertEqual(bracket.matches_by_id[22].round, 2)
+
+
+class BracketGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # semi finals 1 and 2, final 3, third place match 4
+        self.graph = challonge.bracket.BracketGraph([
+            {"id": 1, "state": "open", "player1_id": 10, "player2_id": 40},
+            {"id": 2, "state": "open", "player1_id": 20, "player2_id": 30},
+            {"id": 3, "state": "pending", "player1_id": None, "player2_id": None,
+             "player1_prereq_match_id": 1, "player2_prereq_match_id": 2},
+            {"id": 4, "state": "pending", "player1_id": None, "player2_id": None,
+             "player1_prereq_match_id": 1, "player2_prereq_match_id": 2,
+             "player1_is_prereq_match_loser": True, "player2_is_prereq_match_loser": True}])
+
+    def test_report(self):
+        Advance = challonge.bracket.Advance
+        prediction = self.graph.predict_report(1, 10)
+        self.assertEqual(prediction.advances, [Advance(3, 1, 10), Advance(4, 1, 40)])
+        self.assertEqual(prediction.opened, [])
+        self.graph.apply(prediction)
+
+        prediction = self.graph.predict_report(2, 30)
+        self.assertEqual(prediction.opened, [3, 4])
+        self.graph.apply(prediction)
+        self.assertEqual(self.graph.players[3], [10, 30])
+        self.assertEqual(self.graph.states[2], "complete")
+        self.assertRaises(ValueError, self.graph.predict_report, 3, 20)
+
+    def test_reopen(self):
+        self.graph.apply(self.graph.predict_report(1, 10))
+        self.graph.apply(self.graph.predict_report(2, 30))
+        self.graph.apply(self.graph.predict_report(3, 10))
+
+        prediction = self.graph.predict_reopen(1)
+        self.assertEqual(prediction.reset, [3, 4])
+        self.assertEqual(prediction.advances, [(3, 1, None), (4, 1, None)])
+        self.graph.apply(prediction)
+        self.assertEqual(self.graph.players[3], [None, 30])
+        self.assertEqual(self.graph.states[1], "open")
+        self.assertEqual(self.graph.states[3], "pending")
+
+    def test_grand_finals_reset(self):
+        graph = challonge.bracket.BracketGraph([
+            {"id": 1, "state": "open", "player1_id": 10, "player2_id": 20},
+            {"id": 2, "state": "pending", "player1_prereq_match_id": 1,
+             "player2_prereq_match_id": 1, "player2_is_prereq_match_loser": True}])
+
+        self.assertEqual(graph.predict_report(1, 10).advances, [])
+        self.assertEqual(graph.predict_report(1, 20).opened, [2])
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.cache = challonge.cache.ResponseCache(
+            maxsize=3, ttls={"matches": 5}, clock=lambda: self.now)
+
+    def test_resource_of(self):
+        resource_of = challonge.cache.resource_of
+        self.assertEqual(resource_of("tournaments"), "tournaments")
+        self.assertEqual(resource_of("tournaments/10"), "tournaments")
+        self.assertEqual(resource_of("tournaments/10/matches/2"), "matches")
+        self.assertEqual(resource_of("tournaments/10/participants"), "participants")
+        self.assertEqual(resource_of("tournaments/10/matches/2/attachments"), "attachments")
+
+    def test_ttl(self):
+        key = self.cache.key("tournaments/1/matches", {"state": "open"})
+        self.cache.set(key, ["match"])
+        self.assertEqual(self.cache.get(key), ["match"])
+
+        self.now = 5
+        self.assertIs(self.cache.get(key), challonge.cache.MISSING)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru(self):
+        keys = [self.cache.key("tournaments/%s" % i, {}) for i in range(4)]
+        for key in keys[:3]:
+            self.cache.set(key, key)
+        self.cache.get(keys[0])
+        self.cache.set(keys[3], keys[3])
+
+        self.assertEqual(len(self.cache), 3)
+        self.assertIs(self.cache.get(keys[1]), challonge.cache.MISSING)
+        self.assertEqual(self.cache.get(keys[0]), keys[0])
+
+    def test_invalidate(self):
+        for uri in ("tournaments", "tournaments/1", "tournaments/1/matches", "tournaments/12"):
+            self.cache.set(self.cache.key(uri, {}), uri)
+
+        self.cache.invalidate("tournaments/1/matches/5")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.get(self.cache.key("tournaments/12", {})), "tournaments/12")
+
+    def test_client_invalidates_on_write(self):
+        session = FakeSession()
+        client = challonge.Challonge(cache=self.cache)
+        client.get_session = lambda: session
+
+        session.respond(b'[{"match": {"id": 1}}]')
+        ms = client.matches.index(1)
+        self.assertIs(client.matches.index(1), ms)
+        self.assertEqual(len(session.requests), 1)
+
+        session.respond(b'{"match": {"id": 1}}')
+        client.matches.update(1, 1, scores_csv="1-0")
+        session.respond(b'[{"match": {"id": 1}}]')
+        self.assertIsNot(client.matches.index(1), ms)
+        self.assertEqual(len(session.requests), 3)
+
+
+class StaleReadSession(object):
+    """A session whose first GET is held until release is set, and
+    answered with the data as it was before any write."""
+
+    def __init__(self):
+        self.version = 1
+        self.held = threading.Event()
+        self.release = threading.Event()
+        self.gets = 0
+
+    def request(self, method, url, **kwargs):
+        if method != "GET":
+            self.version += 1
+            return FakeResponse(b'{"match": {"id": 1}}')
+        self.gets += 1
+        version = self.version
+        if self.gets == 1:
+            self.held.set()
+            self.release.wait(5)
+        return FakeResponse(b'[{"match": {"id": 1, "v": %d}}]' % version)
+
+
+class InvalidationRaceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = StaleReadSession()
+
+    def client(self, **options):
+        client = challonge.Challonge(**options)
+        client.get_session = lambda: self.session
+        return client
+
+    def test_stale_get_is_not_cached(self):
+        client = self.client(cache=challonge.cache.ResponseCache())
+        stale = threading.Thread(target=client.matches.index, args=(1,))
+        stale.start()
+        self.session.held.wait(5)
+        client.matches.update(1, 1, scores_csv="1-0")
+        self.session.release.set()
+        stale.join()
+
+        self.assertEqual(client.matches.index(1), [{"id": 1, "v": 2}])
+
+    def test_flight_started_before_write_is_not_joined(self):
+        client = self.client(coalesce=True)
+        stale = threading.Thread(target=client.matches.index, args=(1,))
+        stale.start()
+        self.session.held.wait(5)
+        client.matches.update(1, 1, scores_csv="1-0")
+        try:
+            self.assertEqual(client.matches.index(1), [{"id": 1, "v": 2}])
+            self.assertEqual(self.session.gets, 2)
+        finally:
+            self.session.release.set()
+            stale.join()
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = challonge.store.TournamentStore(":memory:")
+        self.session = FakeSession()
+        self.client = challonge.Challonge(store=self.store)
+        self.client.get_session = lambda: self.session
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_complete_tournament_is_stored(self):
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "complete"}}')
+        self.session.respond(b'[{"match": {"id": 1, "state": "complete"}}]')
+        t = self.client.tournaments.show("cup")
+        ms = self.client.matches.index(7)
+
+        client = challonge.Challonge(store=self.store)
+        client.get_session = lambda: self.session
+        self.assertEqual(client.tournaments.show(7), t)
+        self.assertEqual(client.tournaments.show("cup"), t)
+        self.assertEqual(client.matches.index(7), ms)
+        self.assertEqual(len(self.session.requests), 2)
+
+    def test_pending_tournament_is_not_stored(self):
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "underway"}}')
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "underway"}}')
+        self.client.tournaments.show(7)
+        self.client.tournaments.show(7)
+        self.assertEqual(len(self.session.requests), 2)
+
+    def test_write_invalidates(self):
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "complete"}}')
+        self.client.tournaments.show(7)
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "pending"}}')
+        self.client.tournaments.reset(7)
+        self.assertIsNone(self.store.get(challonge.cache.request_key("tournaments/7", {})))
+
+    def test_eviction(self):
+        self.store.max_entries = 2
+        self.session.respond(b'[{"tournament": {"id": 7, "url": "cup", "state": "complete"}}]')
+        self.client.tournaments.index()
+        for i in range(3):
+            self.session.respond(b'[]')
+            self.client.matches.index(7, state=i)
+
+        keys = [challonge.cache.request_key("tournaments/7/matches", {"state": i}) for i in range(3)]
+        self.assertIsNone(self.store.get(keys[0]))
+        self.assertEqual(self.store.get(keys[2]), b'[]')
+
+    def test_hits_are_not_saved_again(self):
+        self.session.respond(b'{"tournament": {"id": 7, "url": "cup", "state": "complete"}}')
+        observed = []
+        observe = self.store.observe
+        self.store.observe = lambda *args: observed.append(args) or observe(*args)
+        for _ in range(5):
+            self.client.tournaments.show(7)
+        self.assertEqual(len(self.session.requests), 1)
+        self.assertEqual(len(observed), 1)
+
+
+class ConditionalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(conditional=True)
+        self.client.get_session = lambda: self.session
+
+    def test_not_modified(self):
+        self.session.respond(b'[{"match": {"id": 1}}]', headers={"ETag": '"v1"'})
+        self.session.respond(b'', status_code=304)
+        ms = self.client.matches.index(1)
+
+        self.assertIs(self.client.matches.index(1), ms)
+        self.assertEqual(self.session.requests[1][2]["headers"], {"If-None-Match": '"v1"'})
+
+    def test_same_body_without_validators(self):
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'[{"match": {"id": 2}}]')
+        ms = self.client.matches.index(1)
+
+        self.assertIs(self.client.matches.index(1), ms)
+        self.assertFalse(self.session.requests[1][2]["headers"])
+        self.assertEqual(self.client.matches.index(1), [{"id": 2}])
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def test_threads_share_call(self):
+        flights = challonge.singleflight.SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do("key", work)))
+            for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertIsNot(flights.do("key", work), results[0])
+
+    def test_errors_are_shared(self):
+        flights = challonge.singleflight.AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise challonge.ChallongeException("boom")
+
+        async def run():
+            return await asyncio.gather(
+                *[flights.do("key", work) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(r, challonge.ChallongeException) for r in results))
+
+    def test_cancelled_leader(self):
+        flights = challonge.singleflight.AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do("key", work))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flights.do("key", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter, leader
+
+        result, leader = asyncio.run(run())
+        self.assertEqual(result, "result")
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(len(calls), 1)
+
+    def test_all_callers_cancelled(self):
+        flights = challonge.singleflight.AsyncSingleFlight()
+        started = []
+
+        async def work():
+            started.append(asyncio.current_task())
+            await asyncio.sleep(1)
+
+        async def run():
+            callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for c in callers:
+                c.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        self.assertTrue(started[0].cancelled())
+        self.assertEqual(flights._calls, {})
+
+    def test_client_coalesces_gets(self):
+        client = challonge.Challonge(coalesce=True)
+        requests_sent = []
+
+        def request(method, uri, params_prefix, params, info=None):
+            requests_sent.append(uri)
+            time.sleep(0.05)
+            return FakeResponse(b'[{"match": {"id": 1}}]')
+        client._request = request
+
+        with challonge.Challonge() as other:
+            results = other.run_batch(client.matches.index, [((1,), {})] * 4)
+        self.assertEqual(requests_sent, ["tournaments/1/matches"])
+        self.assertTrue(all(r.value is results[0].value for r in results))
+
+
+class SyncTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(conditional=True, timezone="UTC")
+        self.client.get_session = lambda: self.session
+        self.sync = challonge.sync.TournamentSync(1, self.client, resources=["matches"])
+
+    def test_deltas(self):
+        deltas = []
+        self.sync.subscribe(lambda resource, delta: deltas.append((resource, delta)))
+        self.session.respond(
+            b'[{"match": {"id": 1, "updated_at": "2020-01-01T00:00:00Z"}},'
+            b' {"match": {"id": 2, "updated_at": "2020-01-01T00:00:00Z"}}]')
+        self.session.respond(b'', status_code=304)
+        self.session.respond(
+            b'[{"match": {"id": 2, "updated_at": "2020-01-01T00:01:00Z"}},'
+            b' {"match": {"id": 3, "updated_at": "2020-01-01T00:01:00Z"}}]')
+
+        delta = self.sync.poll()["matches"]
+        self.assertEqual([m["id"] for m in delta.inserted], [1, 2])
+        self.assertFalse(self.sync.poll()["matches"])
+
+        delta = self.sync.poll()["matches"]
+        self.assertEqual([m["id"] for m in delta.inserted], [3])
+        self.assertEqual([m["id"] for m in delta.changed], [2])
+        self.assertEqual([m["id"] for m in delta.removed], [1])
+        self.assertEqual(len(deltas), 2)
+        self.assertEqual(sorted(self.sync.snapshots["matches"]), [2, 3])
+
+    def test_failing_callback(self):
+        sync = challonge.sync.TournamentSync(1, self.client)
+        seen = []
+
+        def callback(resource, delta):
+            seen.append(resource)
+            if resource == "matches" and len(seen) < 3:
+                raise ValueError("broken subscriber")
+
+        sync.subscribe(callback)
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'[{"participant": {"id": 2}}]')
+        self.session.respond(b'', status_code=304)
+        self.session.respond(b'', status_code=304)
+
+        self.assertRaises(ValueError, sync.poll)
+        self.assertEqual(seen, ["matches", "participants"])
+        # the delta of matches is reported again, not the one of participants
+        deltas = sync.poll()
+        self.assertEqual(seen, ["matches", "participants", "matches"])
+        self.assertEqual(deltas["matches"].inserted, [{"id": 1}])
+        self.assertFalse(deltas["participants"])
+
+    def test_watch(self):
+        stop = threading.Event()
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'[{"match": {"id": 1, "state": "open"}}]')
+
+        watch = self.sync.watch(interval=0, stop=stop)
+        self.assertEqual(next(watch)[1].inserted, [{"id": 1}])
+        self.assertEqual(next(watch)[1].changed, [{"id": 1, "state": "open"}])
+        stop.set()
+        self.assertEqual(list(watch), [])
+
+
+class SchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(conditional=True, timezone="UTC")
+        self.client.get_session = lambda: self.session
+
+    def test_token_bucket(self):
+        now = [0.0]
+        bucket = challonge.ratelimit.TokenBucket(2, burst=2, clock=lambda: now[0])
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        now[0] = 1.5
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_intervals(self):
+        scheduler = challonge.scheduler.PollScheduler(
+            self.client, min_interval=1, active_interval=4, max_interval=60)
+        scheduler.add(1, lambda *args: None)
+        job = scheduler._jobs[1]
+
+        job.record = {"state": "underway"}
+        self.assertEqual(scheduler._interval(job, False), 2)
+        job.interval = 2
+        self.assertEqual(scheduler._interval(job, False), 4)
+        job.interval = 4
+        self.assertEqual(scheduler._interval(job, False), 4)
+        self.assertEqual(scheduler._interval(job, True), 1)
+
+        job.record = {"state": "pending"}
+        self.assertEqual(scheduler._interval(job, False), 8)
+
+    def test_run(self):
+        changes = []
+        done = threading.Event()
+
+        def on_change(tournament, resource, delta):
+            changes.append((tournament["state"], resource, delta.inserted))
+            done.set()
+
+        self.session.respond(b'{"tournament": {"id": 1, "state": "complete"}}')
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        scheduler = challonge.scheduler.PollScheduler(self.client, workers=2, budget=10)
+        scheduler.add(1, on_change)
+        scheduler.start()
+        self.assertTrue(done.wait(5))
+        scheduler.stop()
+
+        self.assertEqual(changes, [("complete", "matches", [{"id": 1}])])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_failing_on_error(self):
+        def on_error(tournament, e):
+            raise ValueError("broken handler")
+
+        self.session.respond(b'{"errors": ["Not found"]}', status_code=422)
+        scheduler = challonge.scheduler.PollScheduler(self.client, on_error=on_error)
+        scheduler.add(1, lambda *args: None)
+        job = scheduler._next()
+
+        with self.assertLogs("challonge.scheduler", "ERROR"):
+            scheduler._poll(job)
+        self.assertEqual([j for _, _, j in scheduler._queue], [job])
+
+
+class RetryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(
+            "user", "key", timezone="UTC", rate_limit=1000,
+            retry=challonge.ratelimit.RetryPolicy(retries=2, backoff=0.001))
+        self.client.get_session = lambda: self.session
+
+    def test_policy(self):
+        policy = challonge.ratelimit.RetryPolicy(retries=2, backoff=1, max_backoff=3)
+
+        self.assertLessEqual(policy.delay("GET", 0, 503), 1)
+        self.assertLessEqual(policy.delay("GET", 1), 2)
+        self.assertIsNone(policy.delay("GET", 2, 503))
+        self.assertIsNone(policy.delay("GET", 0, 404))
+        self.assertIsNone(policy.delay("POST", 0, 503))
+        self.assertIsNotNone(policy.delay("POST", 0, sent=False))
+        self.assertEqual(policy.delay("POST", 0, 429, retry_after=7), 7)
+
+    def test_retry_after(self):
+        self.assertEqual(challonge.ratelimit.parse_retry_after("2"), 2)
+        self.assertEqual(challonge.ratelimit.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        self.assertIsNone(challonge.ratelimit.parse_retry_after("soon"))
+        self.assertIsNone(challonge.ratelimit.parse_retry_after(None))
+
+    def test_throttled(self):
+        self.session.respond(b'', status_code=429, headers={"Retry-After": "0"})
+        self.session.respond(b'', status_code=503)
+        self.session.respond(b'[{"match": {"id": 1}}]')
+
+        self.assertEqual(self.client.matches.index(1), [{"id": 1}])
+        self.assertEqual(len(self.session.requests), 3)
+
+    def test_not_idempotent(self):
+        self.session.respond(b'', status_code=503)
+        self.assertRaises(requests.HTTPError, self.client.participants.check_in, 1, 2)
+        self.assertEqual(len(self.session.requests), 1)
+
+    def test_connection_error(self):
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(method)
+            raise requests.ConnectionError("reset")
+
+        self.session.request = request
+        self.assertRaises(requests.ConnectionError, self.client.matches.index, 1)
+        self.assertEqual(len(calls), 3)
+
+    def test_limiter_per_credential(self):
+        limiter = challonge.ratelimit.RateLimiter(5)
+        c1 = challonge.Challonge("user", "key", rate_limit=limiter)
+        c2 = challonge.Challonge("user", "key2", rate_limit=limiter)
+
+        self.assertIs(limiter.bucket("user"), limiter.bucket("user"))
+        self.assertIsNot(limiter.bucket("user"), limiter.bucket("other"))
+        self.assertIs(c1.rate_limiter, c2.rate_limiter)
+
+
+class CircuitTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.breaker = challonge.circuit.CircuitBreaker(
+            failures=2, reset_timeout=10, slow_call=1, clock=lambda: self.now[0])
+
+    def test_states(self):
+        self.breaker.record(False)
+        self.breaker.record(True)
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.record(True, duration=5)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertRaises(challonge.CircuitOpenError, self.breaker.before)
+
+        self.now[0] = 10
+        self.breaker.before()
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertRaises(challonge.CircuitOpenError, self.breaker.before)
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, "open")
+
+        self.now[0] = 20
+        self.breaker.before()
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_client(self):
+        session = FakeSession()
+        client = challonge.Challonge("user", "key", circuit_breaker=self.breaker)
+        client.get_session = lambda: session
+        session.respond(b'', status_code=500)
+        session.respond(b'', status_code=502)
+
+        self.assertRaises(requests.HTTPError, client.matches.index, 1)
+        self.assertRaises(requests.HTTPError, client.matches.index, 1)
+        with self.assertRaises(challonge.CircuitOpenError) as cm:
+            client.matches.index(1)
+        self.assertEqual(cm.exception.retry_in, 10)
+        self.assertIsInstance(cm.exception, challonge.ChallongeException)
+        self.assertEqual(len(session.requests), 2)
+
+
+class EmulatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = challonge.emulator.Emulator(seed=1)
+        self.emulator.start()
+        self.client = challonge.Challonge("user", "key", timezone="UTC", api_url=self.emulator.url)
+
+    def tearDown(self):
+        self.client.close()
+        self.emulator.stop()
+
+    def test_single_elimination(self):
+        t = self.client.tournaments.create("cup", "cup", hold_third_place_match=True)
+        self.assertEqual(t["state"], "pending")
+        players = self.client.participants.bulk_add(t["id"], ["a", "b", "c", "d", "e"])
+        self.assertEqual([p["seed"] for p in players], [1, 2, 3, 4, 5])
+
+        self.client.tournaments.start(t["id"])
+        # seeds 4 and 5 play for the semi-final against seed 1
+        open_matches = self.client.matches.index(t["id"], state="open")
+        self.assertEqual(len(open_matches), 2)
+        match = self.client.matches.index(t["id"], participant_id=players[4]["id"])[0]
+        self.assertEqual(match["player1_id"], players[3]["id"])
+
+        self.client.matches.update(t["id"], match["id"], winner_id=players[4]["id"], scores_csv="0-2")
+        semi_final = self.client.matches.index(t["id"], participant_id=players[4]["id"])[1]
+        self.assertEqual(semi_final["state"], "open")
+        self.assertEqual(semi_final["player1_id"], players[0]["id"])
+        self.client.matches.reopen(t["id"], match["id"])
+        semi_final = self.client.matches.show(t["id"], semi_final["id"])
+        self.assertEqual(semi_final["state"], "pending")
+        self.assertIsNone(semi_final["player2_id"])
+
+        while True:
+            open_matches = self.client.matches.index(t["id"], state="open")
+            if not open_matches:
+                break
+            for m in open_matches:
+                self.client.matches.update(t["id"], m["id"], winner_id=m["player1_id"], scores_csv="1-0")
+        self.client.tournaments.finalize(t["id"])
+        t = self.client.tournaments.show(t["id"])
+        self.assertEqual(t["state"], "complete")
+        self.assertEqual(t["progress_meter"], 100)
+
+    def test_round_robin(self):
+        t = self.client.tournaments.create("league", "league", tournament_type="round robin")
+        self.client.participants.bulk_add(t["id"], ["a", "b", "c"])
+        self.client.tournaments.start(t["id"])
+        bracket = challonge.bracket.load(t["id"], self.client)
+        self.assertEqual(len(bracket.matches), 3)
+        for p in bracket.participants:
+            self.assertEqual(len(bracket.matches_of(p["id"])), 2)
+
+    def test_errors(self):
+        t = self.client.tournaments.create("cup", "cup")
+        with self.assertRaises(challonge.ChallongeException) as cm:
+            self.client.tournaments.start(t["id"])
+        self.assertIn("at least 2 participants", str(cm.exception))
+        self.assertRaises(requests.exceptions.HTTPError, self.client.tournaments.show, "unknown")
+
+        self.emulator.error_rate = 1
+        self.emulator.error_status = 503
+        with self.assertRaises(requests.exceptions.HTTPError) as cm:
+            self.client.tournaments.show(t["id"])
+        self.assertEqual(cm.exception.response.headers["Retry-After"], "1")
+
+    def test_parse_params(self):
+        params = challonge.emulator._parse_params([
+            ("tournament[name]", "cup"), ("participants[][name]", "a"),
+            ("participants[][misc]", "1"), ("participants[][name]", "b"), ("state", "all")])
+        self.assertEqual(params, {
+            "tournament": {"name": "cup"},
+            "participants": [{"name": "a", "misc": "1"}, {"name": "b"}],
+            "state": "all"})
+
+
+class CassetteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "cassette.jsonl.gz")
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def test_record_and_replay(self):
+        with challonge.emulator.Emulator() as emulator:
+            with challonge.cassette.Cassette(self.path) as cassette:
+                client = challonge.Challonge(
+                    "user", "key", timezone="UTC", api_url=emulator.url,
+                    adapter=challonge.cassette.RecordingAdapter(cassette))
+                t = client.tournaments.create("cup", "cup")
+                client.participants.bulk_add(t["id"], ["a", "b"])
+                client.tournaments.start(t["id"])
+                matches = client.matches.index(t["id"])
+                with self.assertRaises(challonge.ChallongeException):
+                    client.tournaments.start(t["id"])
+                client.close()
+
+        cassette = challonge.cassette.Cassette(self.path)
+        self.assertEqual(len(cassette.interactions), 5)
+        self.assertNotIn("key", cassette.interactions[0]["body"])
+        client = challonge.Challonge(
+            "user", "key", timezone="UTC",
+            adapter=challonge.cassette.ReplayAdapter(cassette))
+        self.assertEqual(client.tournaments.create("cup", "cup"), t)
+        client.participants.bulk_add(t["id"], ["a", "b"])
+        client.tournaments.start(t["id"])
+        self.assertEqual(client.matches.index(t["id"]), matches)
+        self.assertEqual(list(client.matches.iter_index(t["id"])), matches)
+        with self.assertRaises(challonge.ChallongeException):
+            client.tournaments.start(t["id"])
+        self.assertRaises(
+            challonge.cassette.CassetteMissError, client.tournaments.show, t["id"])
+
+    def test_repeated_requests(self):
+        with challonge.cassette.Cassette(self.path) as cassette:
+            adapter = challonge.cassette.RecordingAdapter(cassette, adapter=FakeAdapter())
+            for body in (b'{"match": {"id": 1}}', b'{"match": {"id": 2}}'):
+                adapter.adapter.content = body
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.get("https://api.challonge.com/v1/tournaments/1/matches/1.json")
+
+        cassette = challonge.cassette.Cassette(self.path)
+        client = challonge.Challonge(
+            "user", "key", timezone="UTC", adapter=challonge.cassette.ReplayAdapter(cassette))
+        self.assertEqual([client.matches.show(1, 1)["id"] for _ in range(3)], [1, 2, 2])
+        cassette.rewind()
+        self.assertEqual(client.matches.show(1, 1)["id"], 1)
+
+
+class HooksTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(
+            timezone="UTC", retry=challonge.ratelimit.RetryPolicy(backoff=0))
+        self.client.get_session = lambda: self.session
+        self.events = []
+
+        def record(info):
+            self.events.append((info.event, info.template, info.attempt, info.status))
+        for event in challonge.hooks.EVENTS:
+            self.client.add_hook(event, record)
+
+    def test_uri_template(self):
+        self.assertEqual(
+            challonge.hooks.uri_template("tournaments/cup/matches/12/attachments/3"),
+            "tournaments/{tournament}/matches/{match}/attachments/{attachment}")
+        self.assertEqual(
+            challonge.hooks.uri_template("tournaments/7/participants/bulk_add"),
+            "tournaments/{tournament}/participants/bulk_add")
+
+    def test_events(self):
+        self.session.respond(b'{"errors": []}', 503)
+        self.session.respond(b'{"match": {"id": 12}}', 200)
+        self.client.matches.show(7, 12)
+        template = "tournaments/{tournament}/matches/{match}"
+        self.assertEqual(self.events, [
+            ("pre_request", template, 0, None),
+            ("post_response", template, 0, 503),
+            ("retry", template, 0, 503),
+            ("pre_request", template, 1, 503),
+            ("post_response", template, 1, 200),
+            ("post_parse", template, 1, 200),
+        ])
+
+        del self.events[:]
+        self.session.respond(b'{"errors": ["Name is taken"]}', 422)
+        self.assertRaises(challonge.ChallongeException, self.client.tournaments.create, "cup", "cup")
+        self.assertEqual([e[0] for e in self.events], ["pre_request", "post_response", "error"])
+
+    def test_failing_hook(self):
+        def broken(info):
+            raise ValueError("broken hook")
+
+        self.client.add_hook("post_response", broken)
+        self.session.respond(b'{"match": {"id": 12}}')
+        with self.assertLogs("challonge.hooks", "ERROR"):
+            self.assertEqual(self.client.matches.update(7, 12, scores_csv="1-0"), None)
+        self.assertIn(("post_response", "tournaments/{tournament}/matches/{match}", 0, 200),
+                      self.events)
+
+    def test_no_hooks(self):
+        client = challonge.Challonge(timezone="UTC")
+        self.assertFalse(client.hooks)
+        self.assertIsNone(client.hooks.start("GET", "tournaments"))
+        self.assertRaises(ValueError, client.add_hook, "post_request", print)
+
+    def test_histogram(self):
+        histogram = challonge.hooks.LatencyHistogram()
+        info = challonge.hooks.RequestInfo("GET", "tournaments/7")
+        for latency in range(1, 101):
+            info.latency = latency / 1000.0
+            histogram.observe(info)
+
+        stats = histogram.snapshot()["GET tournaments/{tournament}"]
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["max"], 0.1)
+        self.assertTrue(0.05 <= stats["p50"] <= 0.05 * 1.19)
+        self.assertTrue(0.099 <= stats["p99"] <= 0.1)
+        self.assertIsNone(histogram.percentile("GET tournaments", 50))
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.client = challonge.Challonge(timezone="UTC")
+        self.client.get_session = lambda: self.session
+        self.exporter = challonge.tracing.InMemoryExporter()
+        challonge.tracing.set_exporter(self.exporter)
+
+    def tearDown(self):
+        challonge.tracing.set_exporter(None)
+
+    def test_spans(self):
+        self.session.respond(b'[{"match": {"id": 1}}]')
+        self.session.respond(b'{"errors": ["Match not found"]}', 422)
+        with challonge.tracing.span("report") as root:
+            self.client.matches.index(7)
+            self.assertRaises(challonge.ChallongeException, self.client.matches.reopen, 7, 1)
+
+        index, reopen = self.exporter.children(root)
+        self.assertEqual(index.name, "challonge.matches.index")
+        self.assertEqual(reopen.name, "challonge.matches.reopen")
+        self.assertIsInstance(reopen.error, challonge.ChallongeException)
+        request, = self.exporter.children(index)
+        self.assertEqual(request.trace_id, root.trace_id)
+        self.assertEqual(request.attributes["http.route"], "tournaments/{tournament}/matches")
+        self.assertEqual(request.attributes["http.status_code"], 200)
+        self.assertIsNone(root.parent_id)
+
+    def test_batch_threads(self):
+        for _ in range(3):
+            self.session.respond(b'{"match": {"id": 1}}')
+        with challonge.tracing.span("report") as root:
+            self.client.matches.update_many(7, [(1, {"winner_id": 2})] * 3)
+
+        update_many, = self.exporter.children(root)
+        updates = self.exporter.children(update_many)
+        self.assertEqual([s.name for s in updates], ["challonge.matches.update"] * 3)
+        for update in updates:
+            self.assertEqual(len(self.exporter.children(update)), 1)
+
+    def test_asyncio_tasks(self):
+        @challonge.tracing.traced
+        async def work():
+            await asyncio.sleep(0)
+
+        async def run():
+            with challonge.tracing.span("root") as root:
+                await asyncio.gather(work(), work())
+            return root
+
+        root = asyncio.run(run())
+        self.assertEqual(len(self.exporter.children(root)), 2)
+
+    def test_interrupted_calls(self):
+        @challonge.tracing.traced
+        def interrupted():
+            raise KeyboardInterrupt()
+
+        @challonge.tracing.traced
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        self.assertRaises(KeyboardInterrupt, interrupted)
+        self.assertRaises(asyncio.CancelledError, asyncio.run, cancelled())
+        spans = self.exporter.spans
+        self.assertEqual(len(spans), 2)
+        self.assertIsInstance(spans[0].error, KeyboardInterrupt)
+        self.assertIsInstance(spans[1].error, asyncio.CancelledError)
+
+    def test_disabled(self):
+        challonge.tracing.set_exporter(None)
+        self.session.respond(b'[]')
+        self.assertIs(challonge.tracing.span("report"), challonge.tracing.NOOP_SPAN)
+        self.client.matches.index(7)
+        self.assertEqual(self.exporter.spans, [])
+
+
+class ClientTestCase(unittest.TestCase):
+
+    def test_independent_state(self):
+        c1 = challonge.Challonge("user1", "key1", timezone="UTC")
+        c2 = challonge.Challonge("user2", "key2", timezone="Asia/Seoul")
+
+        self.assertEqual(c1.get_credentials(), ("user1", "key1"))
+        self.assertEqual(c2.get_credentials(), ("user2", "key2"))
+        self.assertEqual(str(c1.get_timezone()), "UTC")
+        self.assertEqual(str(c2.get_timezone()), "Asia/Seoul")
+        self.assertIsNot(c1.get_session(), c2.get_session())
+
+    def test_resources_use_client(self):
+        client = challonge.Challonge("user", "key")
+        calls = []
+        client.fetch = lambda *args, **kwargs: calls.append(args)
+        client.fetch_and_parse = client.fetch
+
+        client.matches.update(1, 2, scores_csv="1-0")
+        client.tournaments.index()
+        self.assertEqual(calls, [
+            ("PUT", "tournaments/1/matches/2", "match"),
+            ("GET", "tournaments")])
+
+    def test_update_many(self):
+        client = challonge.Challonge("user", "key", batch_workers=2)
+
+        def fetch(method, uri, params_prefix=None, **params):
+            if uri.split("/")[3] == "2":
+                raise challonge.ChallongeException("Match is not open")
+            return params
+
+        client.fetch = fetch
+        results = client.matches.update_many(
+            1, [(m, {"scores_csv": "1-0"}) for m in range(1, 5)])
+
+        self.assertEqual([r.ok for r in results], [True, False, True, True])
+        self.assertIsInstance(results[1].error, challonge.ChallongeException)
+
+        results = client.participants.check_in_many(1, [1, 2, 3])
+        self.assertEqual([r.ok for r in results], [True, False, True])
+
+    def test_iter_index(self):
+        client = challonge.Challonge("user", "key")
+        windows = []
+
+        def fetch_and_parse(method, uri, params_prefix=None, **params):
+            windows.append((params["created_after"], params["created_before"]))
+            if params["created_before"] > datetime.date(2020, 1, 20):
+                return [{"id": 1}, {"id": 2}]
+            if params["created_after"] < datetime.date(2019, 4, 1):
+                return [{"id": params["created_before"].toordinal()}]
+            return []
+
+        client.fetch_and_parse = fetch_and_parse
+        tournaments = client.tournaments.iter_index(
+            created_after="2019-01-01", created_before=datetime.date(2020, 2, 1),
+            window=10, prefetch=True)
+
+        self.assertEqual(list(tournaments)[:2], [{"id": 1}, {"id": 2}])
+        self.assertEqual(windows[0], (datetime.date(2020, 1, 22), datetime.date(2020, 2, 2)))
+        # empty windows double the next one
+        self.assertEqual(windows[3], (datetime.date(2019, 12, 13), datetime.date(2020, 1, 3)))
+        self.assertEqual(windows[-1][0], datetime.date(2018, 12, 31))
+        # and a window with tournaments brings it back to 10 days
+        days = [(before - after).days - 1 for after, before in windows]
+        self.assertEqual(days[5:], [80, 160, 10, 10, 10, 10, 10, 10, 7])
+
+    def test_default_client(self):
+        client = challonge.api.get_default_client()
+        challonge.set_credentials("default", "key")
+        self.assertEqual(client.get_credentials(), ("default", "key"))
+        challonge.set_credentials(username, api_key)
+
+    def test_call(self):
+        with challonge.Challonge(username, api_key) as client:
+            self.assertNotEqual(client.fetch("GET", "tournaments"), '')
+
+
+class AsyncClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import challonge.aio
+        except ImportError:
+            self.skipTest("aiohttp is not installed")
+        self.aio = challonge.aio
+
+    def test_resources_use_client(self):
+        client = self.aio.AsyncChallonge("user", "key")
+        calls = []
+
+        async def fetch(*args, **kwargs):
+            calls.append(args)
+        client.fetch = client.fetch_and_parse = fetch
+
+        async def run():
+            await client.matches.update(1, 2, scores_csv="1-0")
+            await client.participants.index(1)
+        asyncio.run(run())
+
+        self.assertEqual(calls, [
+            ("PUT", "tournaments/1/matches/2", "match"),
+            ("GET", "tournaments/1/participants")])
+
+    def test_update_many(self):
+        client = self.aio.AsyncChallonge("user", "key")
+
+        async def fetch(method, uri, params_prefix=None, **params):
+            if uri.endswith("/2"):
+                raise challonge.ChallongeException("Match is not open")
+        client.fetch = fetch
+
+        results = asyncio.run(client.matches.update_many(
+            1, [(m, {"scores_csv": "1-0"}) for m in range(1, 4)], max_concurrency=2))
+        self.assertEqual([r.ok for r in results], [True, False, True])
+
+    def test_default_client_credentials(self):
+        challonge.set_credentials("default", "key")
+        client = self.aio.api.get_default_client()
+        self.assertEqual(client.get_credentials(), ("default", "key"))
+        challonge.set_credentials(username, api_key)
+
+    def test_call(self):
+        challonge.set_credentials(username, api_key)
+
+        async def run():
+            try:
+                return await self.aio.tournaments.index()
+            finally:
+                await self.aio.close_session()
+        self.assertIsInstance(asyncio.run(run()), list)
+
+
 class TournamentsTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -542,6 +1772,12 @@ class AttachmentsTestCase(unittest.TestCase):
 if __name__ == "__main__":
     username = os.environ.get("CHALLONGE_USER")
     api_key = os.environ.get("CHALLONGE_KEY")
+    if os.environ.get("CHALLONGE_EMULATOR"):
+        # run the suite against a local emulator instead of challonge.com
+        emulator = challonge.emulator.Emulator()
+        emulator.start()
+        challonge.api.CHALLONGE_API_URL = emulator.url
+        username, api_key = username or "pychal", api_key or "pychal"
     if not username or not api_key:
         raise RuntimeError("You must add CHALLONGE_USER and CHALLONGE_KEY \
             to your environment variables to run the test suite")